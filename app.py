@@ -1,577 +1,655 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
-from flask_sqlalchemy import SQLAlchemy
+from flask import Flask, Blueprint, abort, current_app, get_template_attribute, jsonify, make_response, render_template, request, redirect, url_for, flash, session
+import math
+from collections import namedtuple
 import os
-from werkzeug.security import generate_password_hash, check_password_hash
+import uuid
+import click
+from flask.cli import with_appcontext
+from cart import (MAX_BATCH, MAX_ID, MAX_QUANTITY, add_items, apply_quantities, cart_lines, cart_summary, cart_totals, guest_lines,
+                  guest_update, merge_guest_cart)
+from markupsafe import Markup
+from cache import MAX_SEARCH_ENTRIES, RenderCache, VersionCounter, cached_page, catalog_fragment, catalog_version
+from catalog import format_money
+from database import apply_pragmas, database_config, engine_options
+from models import db, User, Cart, Order, Product
+from images import IMAGE_CACHE_MAX_BYTES, DiskCache, build_images, picture, serve_variant
+from inventory import SWEEP_INTERVAL, OutOfStock, release_expired, reserve_cart, start_sweeper
+from orders import SHIPPING_FIELDS, order_totals, place_order
+from passwords import (HASH_METHOD, HASH_WORKERS, MAX_PENDING, HasherBusy, PasswordHasher, hash_password,
+                       verify_password)
+from ratelimit import ACCOUNT_LIMIT, BACKENDS, IP_LIMIT, LoginLimiter, check_login, login_succeeded
+from schema import init_db
+from search import (MAX_QUERY_LENGTH, SearchIndexes, correct_query, index_product, query_tokens, refresh_indexes,
+                    search_products, suggest, unindex_product)
 
-# Initialize Flask app and configure database
 basedir = os.path.abspath(os.path.dirname(__file__))
-app = Flask(__name__)
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(basedir, "app.db")
-db = SQLAlchemy(app)
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config['SECRET_KEY'] = 'your_secret_key'  # Ensure this key is set properly
-
-# Database Models
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(150), unique=True, nullable=False)
-    email = db.Column(db.String(150), unique=True, nullable=False)
-    password = db.Column(db.String(256), nullable=False)
-    role = db.Column(db.String(50), nullable=False, default="user")  # Default role
-
-class Cart(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
-    quantity = db.Column(db.Integer, default=1)
-
-    user = db.relationship('User', backref='cart_items')
-    product = db.relationship('Product', backref='cart_items')
-
-class Product(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(150), nullable=False)
-    price = db.Column(db.String(50), nullable=False)
-    image = db.Column(db.String(150), nullable=True)
-    description = db.Column(db.Text, nullable=True)
-    # description = db.Column(db.Text,nullable=True)
-    
-
-
-
-    def __repr__(self):
-        return f"Product('{self.name}', '{self.price}')"
-
-# Create database tables
-# with app.app_context():
-  
-#     db.create_all()
-def add_admin_user():
-    admin_user = User.query.filter_by(email='admin@example.com').first()
-    if not admin_user:
-        hashed_password = generate_password_hash('adminpassword', method='pbkdf2:sha256')
-        new_admin = User(username='admin', email='admin@example.com', password=hashed_password, role='admin')
-        db.session.add(new_admin)
-        db.session.commit()
-        print("Admin user added to the database.")
-
-with app.app_context():
-    db.drop_all()
-    db.create_all()  # Create tables again
-    add_admin_user()  # Add admin user
-   
-    
-@app.route('/')
+bp = Blueprint('main', __name__)
+
+
+def create_app(config=None):
+    # Initialize Flask app and configure database; no queries or writes happen here
+    app = Flask(__name__)
+    app.config.update(database_config(default_uri="sqlite:///" + os.path.join(basedir, "app.db")))
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config['SECRET_KEY'] = 'your_secret_key'  # Ensure this key is set properly
+    app.config['STOCK_SWEEP_INTERVAL'] = SWEEP_INTERVAL  # seconds; 0 disables the sweeper thread
+    app.config['PASSWORD_HASH_METHOD'] = HASH_METHOD  # changing it rehashes each user at next login
+    app.config['PASSWORD_HASH_WORKERS'] = HASH_WORKERS
+    app.config['PASSWORD_HASH_MAX_PENDING'] = MAX_PENDING
+    app.config['LOGIN_RATE_LIMIT_BACKEND'] = 'memory'  # or 'database' to share across workers
+    app.config['LOGIN_IP_LIMIT'] = IP_LIMIT  # (burst, seconds per extra attempt)
+    app.config['LOGIN_ACCOUNT_LIMIT'] = ACCOUNT_LIMIT
+    app.config['IMAGE_CACHE_DIR'] = os.path.join(app.instance_path, 'image-cache')
+    app.config['IMAGE_CACHE_MAX_BYTES'] = IMAGE_CACHE_MAX_BYTES
+    if config:
+        app.config.update(config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config), **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    }
+
+    db.init_app(app)
+    with app.app_context():
+        apply_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])  # runs on each new connection
+    app.register_blueprint(bp)
+    app.add_template_filter(format_money, 'money')
+    app.add_template_global(picture, 'picture')
+    app.extensions['image_cache'] = DiskCache(app.config['IMAGE_CACHE_DIR'], app.config['IMAGE_CACHE_MAX_BYTES'])
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'], app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_MAX_PENDING'])
+    app.extensions['login_limiter'] = LoginLimiter(
+        BACKENDS[app.config['LOGIN_RATE_LIMIT_BACKEND']](), app.config['LOGIN_IP_LIMIT'],
+        app.config['LOGIN_ACCOUNT_LIMIT'])
+    app.extensions['page_cache'] = RenderCache()
+    app.extensions['fragment_cache'] = RenderCache()
+    app.extensions['card_cursors'] = set()  # (category, after) pairs category pages have linked to
+    app.extensions['search_cache'] = RenderCache(max_entries=MAX_SEARCH_ENTRIES)  # keys come from visitors
+    app.extensions['search_indexes'] = SearchIndexes()
+    # Other workers' catalog edits also refresh the search indexes
+    app.extensions['catalog_version'] = VersionCounter(on_change=refresh_indexes)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(release_holds_command)
+    app.cli.add_command(build_images_command)
+    if app.config['STOCK_SWEEP_INTERVAL'] and not app.testing:
+        start_sweeper(app, app.config['STOCK_SWEEP_INTERVAL'])
+    return app
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Migrate the schema to the current version and load missing seed data."""
+    migrated, added = init_db()
+    click.echo("Schema migrated." if migrated else "Schema already up to date.")
+    click.echo(f"Seeded {added} rows." if added else "Seed data already present.")
+
+
+@click.command('build-images')
+@with_appcontext
+def build_images_command():
+    """Write resized AVIF/WebP/fallback variants of static/images and their manifest."""
+    try:
+        images, written = build_images(current_app.static_folder)
+    except RuntimeError as error:
+        raise click.ClickException(str(error))
+    click.echo(f"Built variants for {images} images ({written} files written).")
+
+
+@click.command('release-holds')
+@with_appcontext
+def release_holds_command():
+    """Return stock held by expired checkout reservations."""
+    click.echo(f"Released {release_expired()} expired holds.")
+
+
+@bp.route('/')
+@cached_page('index.html', 'base.html')
 def home():
     return render_template('index.html')
-@app.route('/admin/products', methods=['GET'])
+@bp.route('/admin/products', methods=['GET'])
 def admin_products():
     if 'user_id' not in session or session['role'] != 'admin':
         flash('Access denied. Admins only.', 'danger')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
 
-    products = Product.query.all()
-    return render_template('admin_products.html', products=products)
+    after = request.args.get('after', 0, type=int)
+    products, next_cursor = keyset_page(Product.query, after)
+    next_url = url_for('main.admin_products', after=next_cursor) if next_cursor else None
+    if request.headers.get('X-Requested-With') == 'fetch':
+        return fragment_response('_admin_product_rows.html', products, next_url)
+    return render_template('admin_products.html', products=products, next_cursor=next_cursor,
+                           next_page_url=next_url, next_fragment_url=next_url)
 
-@app.route('/admin/products/edit/<int:product_id>', methods=['GET', 'POST'])
+@bp.route('/admin/products/edit/<int:product_id>', methods=['GET', 'POST'])
 def edit_product(product_id):
     if 'user_id' not in session or session['role'] != 'admin':
         flash('Access denied. Admins only.', 'danger')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
 
     product = Product.query.get_or_404(product_id)
 
     if request.method == 'POST':
+        try:
+            product.price = request.form['price']
+        except ValueError:
+            flash('Price must look like $12.99 or ₹44 per kg.', 'danger')
+            return render_template('edit_products.html', product=product)
+        stock = request.form.get('stock', '')
+        if not stock.isdigit():
+            flash('Stock must be a whole number.', 'danger')
+            return render_template('edit_products.html', product=product)
+        product.stock = int(stock)
         product.name = request.form['name']
-        product.price = request.form['price']
         product.image = request.form['image']
+        catalog_version().bump()
         db.session.commit()
+        index_product(product.id, product.name)
         flash('Product updated successfully!', 'success')
-        return redirect(url_for('admin_products'))
+        return redirect(url_for('main.admin_products'))
 
     return render_template('edit_products.html', product=product)
 
-@app.route('/admin/products/delete/<int:product_id>', methods=['POST'])
+@bp.route('/admin/products/delete/<int:product_id>', methods=['POST'])
 def delete_product(product_id):
     if 'user_id' not in session or session['role'] != 'admin':
         flash('Access denied. Admins only.', 'danger')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
 
     product = Product.query.get_or_404(product_id)
     db.session.delete(product)
+    catalog_version().bump()
     db.session.commit()
+    unindex_product(product_id)
     flash('Product deleted successfully!', 'success')
-    return redirect(url_for('admin_products'))
+    return redirect(url_for('main.admin_products'))
 
-@app.route('/checkout', methods=['POST'])
+@bp.route('/checkout', methods=['POST'])
 def checkout():
     if 'user_id' not in session:
         flash('Please log in to proceed to checkout.', 'warning')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
+
+    idempotency_key = request.form.get('idempotency_key', '')
+    shipping = {field: request.form.get(field, '').strip() for field in SHIPPING_FIELDS}
+    if not idempotency_key or len(idempotency_key) > 64 or '' in shipping.values():
+        flash('Please fill in all shipping details.', 'danger')
+        return redirect(url_for('main.checkout_summary'))
+
+    try:
+        order = place_order(session['user_id'], idempotency_key, shipping)
+    except OutOfStock as error:
+        for product in error.products:
+            flash(f'Sorry, only {product.stock} of {product.name} left in stock.', 'danger')
+        return redirect(url_for('main.cart'))
+    if order is None:
+        flash('Your cart is empty.', 'warning')
+        return redirect(url_for('main.cart'))
+
+    flash('Order placed successfully!', 'success')
+    return redirect(url_for('main.order_detail', order_id=order.id))
+
+@bp.route('/checkout_page')
+def checkout_page():
+    return redirect(url_for('main.checkout_summary'))
 
-    # Clear the cart from the database
-    Cart.query.filter_by(user_id=session['user_id']).delete()
-    db.session.commit()
+@bp.route('/orders/<int:order_id>')
+def order_detail(order_id):
+    if 'user_id' not in session:
+        flash('Please log in to view your orders.', 'warning')
+        return redirect(url_for('main.login'))
 
-    # Redirect to the actual checkout page
-    return redirect(url_for('checkout_page'))
+    order = Order.query.filter_by(id=order_id, user_id=session['user_id']).first_or_404()
+    return render_template('order_detail.html', order=order, totals=order_totals(order))
 
-@app.route('/checkout_page')
-def checkout_page():
-    if 'user_id' not in session:
-        flash('Please log in to view the checkout page.', 'warning')
-        return redirect(url_for('login'))
-
-    return render_template('checkout.html')  
-
-
-
-# @app.route('/beauty-products')
-def add_beauty_products():
-    beauty_products = [
-        {'name': 'Sol de Janeiro Beija Flor Jet Set', 'price': '$32', 'image': 'static/images/product1.webp'},
-        {'name': 'Charlotte Tilbury Beauty Pillow Talk Mini Pillow Talk lipstick and more', 'price': '$25', 'image': 'static/images/product2.webp'},
-        {'name': 'Sol de Janeiro Bom Dia Bright Jet set', 'price': '$33', 'image': 'static/images/product3.jpg'},
-        {'name': 'Glow Recipe Fruit Babies Bestsellers Kit', 'price': '$250', 'image': 'static/images/product4.jpeg'},
-        {'name': 'Fenty Beauty Pro Filtr Soft Matte Longwear Foundation', 'price': '$38', 'image': 'static/images/product5.jpeg'},
-        {'name': 'Urban Decay Naked3 Eyeshadow Palette', 'price': '$54', 'image': 'static/images/product6.jpeg'},
-        {'name': 'Anastasia Beverly Hills Brow Wiz', 'price': '$21', 'image': 'static/images/product7.jpeg'},
-        {'name': 'Too Faced Better Mascara', 'price': '$25', 'image': 'static/images/product8.jpeg'},
-        {'name': 'MAC Cosmetics Matte Lipstick', 'price': '$19', 'image': 'static/images/product9.jpeg'},
-        {'name': 'Tarte Shape Tape Concealer', 'price': '$27', 'image': 'static/images/product10.jpeg'},
-        {'name': 'Maybelline Fit Me Matte + Poreless Foundation', 'price': '$10', 'image': 'static/images/product11.jpeg'},
-        {'name': 'Huda Beauty Desert Dusk Palette', 'price': '$65', 'image': 'static/images/product12.jpeg'},
-        {'name': 'NARS Radiant Creamy Concealer', 'price': '$30', 'image': 'static/images/product13.jpeg'},
-        {'name': 'Fenty Beauty Killawatt Freestyle Highlighter', 'price': '$36', 'image': 'static/images/product14.jpeg'},
-        {'name': 'L`Oréal Paris Voluminous Lash Paradise Mascara', 'price': '$12', 'image': 'static/images/product15.jpeg'},
-        {'name': 'Benefit Cosmetics Hoola Matte Bronzer', 'price': '$30', 'image': 'static/images/product16.jpeg'},
-        {'name': 'Charlotte Tilbury Airbrush Flawless Finish Powder', 'price': '$45', 'image': 'static/images/product17.jpeg'},
-        {'name': 'Becca Shimmering Skin Perfector Pressed Highlighter', 'price': '$38', 'image': 'static/images/product18.jpeg'},
-        {'name': 'IT Cosmetics Your Skin But Better CC+ Cream', 'price': '$39', 'image': 'static/images/product19.jpeg'},
-        {'name': 'Tatcha The Dewy Skin Cream', 'price': '$68', 'image': 'static/images/product20.jpeg'},
-    ]
-    
-
-    for product in beauty_products:
-        new_product = Product(name=product['name'], price=product['price'], image=product['image']
-        ,description=product.get('description',''))
-        db.session.add(new_product)
 
-        db.session.commit()
-    print("Beauty products added to the database.")
 
+PAGE_SIZE = 24
+
+# category -> (page template, cards partial shared with the infinite-scroll fragment)
+CATEGORY_TEMPLATES = {
+    'beauty': ('beauty.html', '_beauty_cards.html'),
+    'pharmacy': ('pharmacy.html', '_pharmacy_cards.html'),
+    'fruits_veg': ('fruits&veg.html', '_grocery_cards.html'),
+    'snacks': ('snacks.html', '_grocery_cards.html'),
+    'essentials': ('all.html', '_grocery_cards.html'),
+}
+
+
+def keyset_page(query, after, limit=PAGE_SIZE):
+    # Seek past the last id seen instead of using OFFSET, so page 100 costs the same as page 1
+    rows = query.filter(Product.id > after).order_by(Product.id).limit(limit + 1).all()
+    return rows[:limit], (rows[limit - 1].id if len(rows) > limit else None)
+
+
+def fragment_response(template, products, next_url):
+    response = make_response(render_template(template, products=products))
+    if next_url:
+        response.headers['X-Next-Page'] = next_url
+    return response
+
+
+def category_cards_html(category, after):
+    # (rendered cards, next cursor) for one page of a category; renders read
+    # ix_product_category, which SQLite orders by (category, id)
+    after = min(max(after, 0), MAX_ID)
+    issued = current_app.extensions['card_cursors']
+
+    def render():
+        products, next_cursor = keyset_page(Product.query.filter_by(category=category), after)
+        if next_cursor is not None:
+            issued.add((category, next_cursor))
+        return Markup(render_template(CATEGORY_TEMPLATES[category][1], products=products)), next_cursor
 
-with app.app_context():
-    # db.drop_all()  # Drop all tables (use with caution)
-    db.create_all()  # Create tables again
-    add_beauty_products()  # Add beauty products after recreating the tables
-@app.route("/beauty")
+    # Only the first page and cursors handed out above are cached, so made-up ?after=
+    # values can't flood the fragment cache and push out the real pages
+    if after and (category, after) not in issued:
+        return render()
+    return catalog_fragment('fragment_cache', ('cards', category, after), render)
+
+
+def render_category(category):
+    after = request.args.get('after', 0, type=int)
+    cards, next_cursor = category_cards_html(category, after)
+    return render_template(
+        CATEGORY_TEMPLATES[category][0], cards=cards, next_cursor=next_cursor,
+        next_page_url=url_for(request.endpoint, after=next_cursor),
+        next_fragment_url=url_for('main.category_cards', category=category, after=next_cursor),
+    )
+
+
+@bp.route("/beauty")
 def beauty():
-    products = Product.query.all()  # Fetch all products from the database
-    return render_template('beauty.html', products=products)
+    return render_category('beauty')
 
-@app.route('/product')
+@bp.route('/product')
 def products():
-    products_list = [
-        {"name": "Pain Reliever Tablet", "price": "$12.99", "expiry": "12/2026", "image": "static/images/painrelif.jpg"},
-        {"name": "Cough Syrup", "price": "$8.50", "expiry": "03/2025", "image": "static/images/cough.jpg"},
-        {"name": "Multivitamin Capsules", "price": "$15.75", "expiry": "11/2027", "image": "static/images/multivitamin.jpg"},
-        {"name": "Antibiotic Ointment", "price": "$5.99", "expiry": "08/2024", "image": "static/images/onitment.jpg"},
-        {"name": "Cold Relief Capsules", "price": "$10.30", "expiry": "06/2025", "image": "static/images/cold.jpg"},
-        {"name": "Allergy Relief Tablets", "price": "$7.99", "expiry": "09/2025", "image": "static/images/allergy.jpg"},
-        {"name": "Digestive Aid Tablets", "price": "$6.50", "expiry": "07/2026", "image": "static/images/digestive.jpg"},
-        {"name": "Vitamin D3 Supplement", "price": "$9.00", "expiry": "04/2027", "image": "static/images/vitamind33.jpg"},
-        {"name": "Antacid Tablets", "price": "$3.75", "expiry": "01/2025", "image": "static/images/amtacid.jpg"},
-        {"name": "Headache Relief Gel", "price": "$4.99", "expiry": "05/2026", "image": "static/images/haedache.jpg"},
-        {"name": "Hair Growth Shampoo", "price": "$12.00", "expiry": "02/2027", "image": "static/images/hair.jpg"},
-        {"name": "Sleep Aid Tablets", "price": "$8.40", "expiry": "12/2025", "image": "static/images/sleep.jpg"},
-        {"name": "Band-Aids", "price": "$2.99", "expiry": "10/2026", "image": "static/images/bandaid.jpg"},
-        {"name": "Eye Drops", "price": "$5.50", "expiry": "01/2025", "image": "static/images/eyedrops.jpg"},
-        {"name": "Muscle Relief Cream", "price": "$7.25", "expiry": "08/2025", "image": "static/images/muscle.jpg"},
-        {"name": "Moisturizing Lotion", "price": "$6.80", "expiry": "03/2025", "image": "static/images/moisturizing.jpg"},
-        {"name": "Thermometer", "price": "$15.99", "expiry": "06/2027", "image": "static/images/allergy.jpg"},
-        {"name": "Sunscreen Lotion", "price": "$12.99", "expiry": "09/2026", "image": "static/images/sunscreen.jpg"},
-        {"name": "First Aid Kit", "price": "$25.00", "expiry": "07/2027", "image": "static/images/firstaid.jpg"},
-        {"name": "Cold Compress", "price": "$8.50", "expiry": "11/2026", "image": "static/images/compress.jpg"}
-    ]
-    return render_template('pharmacy.html', products=products_list)
-
-@app.route('/fruits&veg')
+    return render_category('pharmacy')
+
+@bp.route('/fruits&veg')
 def fruits():
-    products_list = [
-        {'name': 'Apple', 'image': 'apple.png', 'price': '₹130 per each'},
-        {'name': 'Banana', 'image': 'banana.png', 'price': '₹44 per kg'},
-        {'name': 'Mango', 'image': 'mango.png', 'price': '₹100 per kg'},
-        {'name': 'Orange', 'image': 'orange.png', 'price': '₹65 per kg each'},
-        {'name': 'Litchi', 'image': 'litchi.png', 'price': '₹100 per kg'},
-        {'name': 'Kiwi', 'image': 'kiwi.png', 'price': '₹123 (3 pieces)'},
-        {'name': 'DragonFruit', 'image': 'dragonfruit.png', 'price': '₹63 each'},
-        {'name': 'Pineapple', 'image': 'pineapple.png', 'price': '₹93 each'},
-        {'name': 'Strawberry', 'image': 'strawberry.png', 'price': '₹96 (1 pack)'},
-        {'name': 'Grapes', 'image': 'grapes.png', 'price': '₹70 (500g)'},
-        {'name': 'Carrot', 'image': 'carrot.png', 'price': '₹20 per kg'},
-        {'name': 'Pomegranate', 'image': 'pomegranet.png', 'price': '₹115 (500g)'},
-        {'name': 'Watermelon', 'image': 'watermelon.png', 'price': '₹35 each'},
-        {'name': 'Muskmelon', 'image': 'muskmelon.png', 'price': '₹67 each'},
-        {'name': 'Papaya', 'image': 'papaya.png', 'price': '₹111 per kg'},
-        {'name': 'Guava', 'image': 'guava.png', 'price': '₹120 per kg'},
-        {'name': 'Potato', 'image': 'potato.png', 'price': '₹30 per kg'},
-        {'name': 'Tomato', 'image': 'tomato.png', 'price': '₹40 per kg'},
-        {'name': 'Green Chilli', 'image': 'greenChilli.png', 'price': '₹14 (100g)'},
-        {'name': 'Cauliflower', 'image': 'cauliflower.png', 'price': '₹15 each'},
-        {'name': 'Ginger', 'image': 'ginger.png', 'price': '₹23 (100g)'},
-        {'name': 'Capsicum', 'image': 'capsicum.png', 'price': '₹80 per kg'},
-        {'name': 'Mushroom', 'image': 'mushroom.png', 'price': '₹50 (200g)'},
-        {'name': 'Garlic', 'image': 'garlic.png', 'price': '₹85 (200g)'},
-        {'name': 'Cucumber', 'image': 'cucumber.png', 'price': '₹30 per kg'},
-        {'name': 'Beans', 'image': 'beans.png', 'price': '₹29 (200g)'},
-        {'name': 'Raddish', 'image': 'raddish.png', 'price': '₹30 per kg'},
-        {'name': 'Lemon', 'image': 'lemon.png', 'price': '₹30 (220g)'},
-        {'name': 'Broccoli', 'image': 'broccoli.png', 'price': '₹25 (300g)'},
-        {'name': 'Onion', 'image': 'onion.png', 'price': '₹50 per kg'},
-    ]
-    return render_template('fruits&veg.html', products=products_list)
-
-@app.route('/snacks')
+    return render_category('fruits_veg')
+
+@bp.route('/snacks')
 def snacks():
-    products_list = [
-        {'name': 'Maggi', 'image': 'maggi.png', 'price': '₹10 per each'},
-        {'name': 'Tedhe Medhe', 'image': 'TedheMedhe.png', 'price': '₹10 per each'},
-        {'name': "Lay's India's Magic Masala", 'image': 'BlueLays.png', 'price': '₹10 per each'},
-        {'name': "Lay's Classic Salted", 'image': 'YellowLays.png', 'price': '₹10 per each'},
-        {'name': "Lay's American Style Cream & Onion", 'image': 'greenLays.png', 'price': '₹10 per each'},
-        {'name': "Maggi Cheese Macroni Instant Pasta", 'image': 'cheese.png', 'price': '₹35 per each'},
-        {'name': "Maggi Masala Penne Instant Pasta", 'image': 'masala.png', 'price': '₹35 per each'},
-        {'name': "Oreo", 'image': 'oreo.png', 'price': '₹10 per each'},
-        {'name': "Dark Fantasy", 'image': 'DarkFantasy.png', 'price': '₹30'},
-        {'name': "Hide & Seek", 'image': 'Hide.png', 'price': '₹30 per each'},
-        {'name': "Jim Jam", 'image': 'JimJam.png', 'price': '₹10 per each'},
-        {'name': "Good Day", 'image': 'Gooday.png', 'price': '₹10 per each'},
-        {'name': "Little Hearts", 'image': 'Hearts.png', 'price': '₹10 per each'},
-        {'name': "Ferrero Rocher", 'image': 'Ferrero.png', 'price': '₹763 (24 pieces)'},
-        {'name': "Dairy Milk Silk Fruit & Nut", 'image': 'FruitNut.png', 'price': '₹186'},
-        {'name': "Kit Kat", 'image': 'Kitkat.png', 'price': '₹110'},
-        {'name': "Crispello", 'image': 'crispello.png', 'price': '₹40'},
-        {'name': "Munch", 'image': 'Munch.png', 'price': '₹57'},
-        {'name': "ThumsUp", 'image': 'ThumsUp.png', 'price': '₹40 (750ml)'},
-        {'name': "Choco Latte", 'image': 'ChocoLatte.png', 'price': '₹120'},
-        {'name': "Cold Coffee", 'image': 'ColdCoffee.png', 'price': '₹120'},
-        {'name': "Diet Coke", 'image': 'diet.png', 'price': '₹40 (300ml)'},
-        {'name': "Fanta", 'image': 'fanta.png', 'price': '₹40 (750ml)'},
-        {'name': "Sprite", 'image': 'sprite.png', 'price': '₹40 (750ml)'},
-        {'name': "Limca", 'image': 'limca.png', 'price': '₹40 (750ml)'},
-        {'name': "Maza", 'image': 'maza.png', 'price': '₹40 (600ml)'},
-        {'name': "Mountain Dew", 'image': 'dew.png', 'price': '₹86 (2 X 750ml)'},
-        {'name': "Aloo Bhujia", 'image': 'bhujia.png', 'price': '₹221 per kg'},
-        {'name': "Kinder Joy", 'image': 'joy.png', 'price': '₹48'},
-        {'name': "Makhana", 'image': 'makhana.png', 'price': '₹160 (100g)'},
-    ]
-    return render_template('snacks.html', products=products_list)
-
-
-@app.route('/all')
+    return render_category('snacks')
+
+@bp.route('/all')
 def all():
-    product2=[
-
-    {'name': "Amul Moti Milk", 'image': 'milk.png', 'price': '$0.40 (450ml)'},
-    {'name': "Whole Wheat Bread", 'image': 'wheatBread.png', 'price': '$0.72 (400g)'},
-    {'name': "Brown Bread", 'image': 'Brown.png', 'price': '$0.66 (400g)'},
-    {'name': "Bonn Pav Bread", 'image': 'pav.png', 'price': '$0.54 (250g)'},
-    {'name': "Eggs", 'image': 'eggs.png', 'price': '$0.86 (6 pieces)'},
-    {'name': "Kellogg's Corn Flakes", 'image': 'flakes.png', 'price': '$1.44 (250g)'},
-    {'name': "Kellogg's Muesli Nuts Delight", 'image': 'muesli.png', 'price': '$6.53 (1 kg)'},
-    {'name': "Saffola Masala Veggie Twist Oats", 'image': 'oats.png', 'price': '$0.82 (pack of 4)'},
-    {'name': "Mother Dairy Classic Curd", 'image': 'curd.png', 'price': '$0.30 (200g)'},
-    {'name': "Amul Salted Butter", 'image': 'butter.png', 'price': '$0.72 (100g)'},
-    {'name': "Amul Cheese Slices", 'image': 'cheeseSlices.png', 'price': '$1.02 (100g)'},
-    {'name': "Amul Fresh Cream", 'image': 'cream.png', 'price': '$0.82 (250ml)'},
-    {'name': "Nestle Milkmaid Sweetened Condensed Milk", 'image': 'condensedMilk.png', 'price': '$1.68 (380g)'},
-    {'name': "MyFitness Chocolate Crunchy Peanut Butter (227 g)", 'image': 'peanutButter.png', 'price': '$1.75 (227g)'},
-    {'name': "Dabur Honey", 'image': 'honey.png', 'price': '$1.38 (250g)'},
-    {'name': "Kissan Fresh Tomato Ketchup", 'image': 'ketchup.png', 'price': '$1.20 (850g)'},
-    {'name': "Veg Mayonnaise", 'image': 'mayo.png', 'price': '$0.59 (100g)'},
-    {'name': "Ching's Secret Schezwan Chutney", 'image': 'chutney.png', 'price': '$1.01 (250g)'},
-    {'name': "Hershey's Chocolate Syrup", 'image': 'chocoSyrup.png', 'price': '$1.26 (200g)'},
-    {'name': "Smith & Jones Ginger Garlic Paste", 'image': 'garlicpaste.png', 'price': '$0.55 (200g)'},
-    {'name': "Vinegar", 'image': 'vinegar.png', 'price': '$0.80 (610ml)'},
-    {'name': "Tata Tea Premium Tea", 'image': 'tata.png', 'price': '$1.68 (250g)'},
-    {'name': "Brooke Bond Taj Mahal Tea", 'image': 'taj.png', 'price': '$0.78 (100g)'},
-    {'name': "Nescafe Classic - Instant Coffee Powder", 'image': 'coffee.png', 'price': '$2.76 (45g)'},
-    {'name': "Aashirvaad Shudh Chakki Atta", 'image': 'ashirvad.png', 'price': '$2.86 (5kg)'},
-    {'name': "Fortune Chakki Fresh", 'image': 'fortune.png', 'price': '$2.72 (5kg)'},
-    {'name': "Daawat Rozana Gold Basmati Rice", 'image': 'rice.png', 'price': '$4.98 (5kg)'},
-    {'name': "Whole Farm Grocery Kabuli Chana", 'image': 'chana.png', 'price': '$1.87 (1kg)'},
-    {'name': "Whole Farm Premium Kashmiri Red Rajma", 'image': 'rajma.png', 'price': '$1.44 (500g)'},
-    {'name': "Toor Dal", 'image': 'toor.png', 'price': '$2.38 (1kg)'},
-    {'name': "Urad Dal (Chilka)", 'image': 'urad.png', 'price': '$0.92 (500g)'},
-    {'name': "Brown Chana", 'image': 'brownchana.png', 'price': '$0.79 (500g)'},
-    {'name': "Happydent White Spearmint Sugar Free Chewing Gum", 'image': 'happydent.png', 'price': '$0.59'},
-    {'name': "Parle Melody Chocolaty Candy", 'image': 'melody.png', 'price': '$1.20'},
-    {'name': "Lotte Choco Pie", 'image': 'pie.png', 'price': '$0.96'}
-]
-
- 
- 
-    return render_template("all.html",products=product2)
-
-
-
-
-
-
-@app.route('/add_to_cart/<int:product_id>', methods=['POST'])
-def add_to_cart(product_id):
+    return render_category('essentials')
+
+@bp.route('/catalog/<category>/cards')
+def category_cards(category):
+    # Next page of product cards only, for infinite scroll
+    if category not in CATEGORY_TEMPLATES:
+        abort(404)
+    cards, next_cursor = category_cards_html(category, request.args.get('after', 0, type=int))
+    response = make_response(cards)
+    if next_cursor:
+        response.headers['X-Next-Page'] = url_for('main.category_cards', category=category, after=next_cursor)
+    return response
+
+def current_cart_lines():
+    if 'user_id' in session:
+        return cart_lines(session['user_id'])
+    return guest_lines(session.get('guest_cart', {}))
+
+
+def change_cart(quantities, increment=False):
+    # Logged-in carts live in the Cart table, guest carts in the signed session cookie.
+    # Returns False if a guest cart would grow too large for the cookie.
+    if any(not 0 < product_id <= MAX_ID for product_id in quantities):
+        abort(404)
     if 'user_id' not in session:
-        flash('Please log in to add items to your cart.', 'warning')
-        return redirect(url_for('login'))
+        guest_cart = guest_update(session.get('guest_cart', {}), quantities, increment)
+        if guest_cart is None:
+            return False
+        session['guest_cart'] = guest_cart
+    elif increment:
+        add_items(session['user_id'], quantities)
+    else:
+        apply_quantities(session['user_id'], quantities)
+    return True
 
-    existing_cart_item = Cart.query.filter_by(user_id=session['user_id'], product_id=product_id).first()
 
-    if existing_cart_item:
-        existing_cart_item.quantity += 1 
+@bp.route('/add_to_cart/<int:product_id>', methods=['POST'])
+def add_to_cart(product_id):
+    if change_cart({product_id: 1}, increment=True):
+        flash('Item added to cart!', 'success')
     else:
-        new_cart_item = Cart(user_id=session['user_id'], product_id=product_id)
-        db.session.add(new_cart_item)
-
-    db.session.commit()
-    flash('Item added to cart!', 'success')
-    return redirect(request.referrer)
+        flash('Your cart is full. Please log in to add more items.', 'warning')
+    return redirect(request.referrer or url_for('main.cart'))
 
 
 
-@app.route('/buy_now/<int:product_id>', methods=['GET', 'POST'])
+@bp.route('/buy_now/<int:product_id>', methods=['GET', 'POST'])
 def buy_now(product_id):
-    # Ensure user is logged in
+    # Add the item, or bump its quantity if it's already in the cart
+    change_cart({product_id: 1}, increment=True)
+
+    # Guests keep the item in their cart and get it back after logging in
     if 'user_id' not in session:
         flash('Please log in to proceed to checkout.', 'warning')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
 
-    # Check if the item is already in the cart
-    existing_cart_item = Cart.query.filter_by(user_id=session['user_id'], product_id=product_id).first()
-
-    # If the item is not in the cart, add it
-    if existing_cart_item:
-        existing_cart_item.quantity += 1  # Increase the quantity if it's already in the cart
-    else:
-        new_cart_item = Cart(user_id=session['user_id'], product_id=product_id)
-        db.session.add(new_cart_item)
-
-    db.session.commit()
     flash('Item added to cart! Redirecting to checkout...', 'success')
 
     # Redirect to the checkout page after adding to cart
-    return redirect(url_for('checkout_summary'))
-
-
-@app.route('/checkout/summary')
+    return redirect(url_for('main.checkout_summary'))
+
+
+def cart_api_response():
+    response = jsonify(cart_summary(current_cart_lines()))
+    # Lets the mini-cart poll cheaply: an unchanged cart answers 304 with no body
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def json_object():
+    # The request body as a dict; anything else, including valid non-object JSON, is a 400
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        abort(400)
+    return data
+
+
+def api_quantity(default=None):
+    data = json_object()
+    quantity = data.get('quantity', default)
+    if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity > MAX_QUANTITY:
+        abort(400)
+    return data, quantity
+
+
+def parse_quantities(items):
+    # {"12": 6, "7": 0} -> {12: 6, 7: 0}; None if malformed or naming unknown products
+    if not isinstance(items, dict) or not items or len(items) > MAX_BATCH:
+        return None
+    try:
+        quantities = {int(product_id): quantity for product_id, quantity in items.items()}
+    except ValueError:
+        return None
+    if any(not 0 < product_id <= MAX_ID for product_id in quantities):
+        return None
+    if any(isinstance(quantity, bool) or not isinstance(quantity, int) or quantity > MAX_QUANTITY
+           for quantity in quantities.values()):
+        return None
+    wanted = {product_id for product_id, quantity in quantities.items() if quantity > 0}
+    if wanted:
+        known = set(db.session.scalars(db.select(Product.id).where(Product.id.in_(wanted))))
+        if known != wanted:
+            return None
+    return quantities
+
+
+@bp.route('/api/cart', methods=['GET'])
+def api_cart():
+    return cart_api_response()
+
+
+@bp.route('/api/cart/items', methods=['POST'])
+def api_cart_add():
+    data, quantity = api_quantity(default=1)
+    product_id = data.get('product_id')
+    if (quantity < 1 or isinstance(product_id, bool) or not isinstance(product_id, int)
+            or not 0 < product_id <= MAX_ID or db.session.get(Product, product_id) is None):
+        abort(400)
+    if not change_cart({product_id: quantity}, increment=True):
+        abort(400)
+    return cart_api_response()
+
+
+@bp.route('/api/cart/items/<int:product_id>', methods=['PUT'])
+def api_cart_set(product_id):
+    _, quantity = api_quantity()
+    if not 0 < product_id <= MAX_ID or quantity > 0 and db.session.get(Product, product_id) is None:
+        abort(404)
+    if not change_cart({product_id: quantity}):
+        abort(400)
+    return cart_api_response()
+
+
+@bp.route('/api/cart/batch', methods=['POST'])
+def api_cart_batch():
+    # Set many quantities at once: {"items": {"<product_id>": quantity, ...}}, 0 removes
+    quantities = parse_quantities(json_object().get('items'))
+    if quantities is None or not change_cart(quantities):
+        abort(400)
+    return cart_api_response()
+
+
+@bp.route('/api/cart/items/<int:product_id>', methods=['DELETE'])
+def api_cart_remove(product_id):
+    change_cart({product_id: 0})
+    return cart_api_response()
+
+
+@bp.route('/checkout/summary')
 def checkout_summary():
     if 'user_id' not in session:
         flash('Please log in to proceed to checkout.', 'warning')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
 
-    # Retrieve the user's cart items within the request context
-    cart_items = Cart.query.filter_by(user_id=session['user_id']).all()  # Get all items for the user
+    cart_items = cart_lines(session['user_id'])
+    if not cart_items:
+        flash('Your cart is empty.', 'warning')
+        return redirect(url_for('main.cart'))
 
-    # Calculate the total price
-    total_price = sum(
-        float(item.product.price.replace('$', '').replace(',', '')) * int(item.quantity) 
-        for item in cart_items
-    )
+    # Hold the stock while the shopper fills in the form, so it can't sell out from under them
+    try:
+        reserve_cart(session['user_id'])
+    except OutOfStock as error:
+        for product in error.products:
+            flash(f'Sorry, only {product.stock} of {product.name} left in stock.', 'danger')
+        return redirect(url_for('main.cart'))
 
-    return render_template('checkout.html', cart_items=cart_items, total_price=total_price)
+    # A fresh key per checkout form; resubmitting the same form can't create a second order
+    return render_template('checkout.html', cart_items=cart_items, totals=cart_totals(cart_items),
+                           idempotency_key=uuid.uuid4().hex)
 
 
 
-@app.route('/cart')
+@bp.route('/cart')
 def cart():
-    if 'user_id' not in session:
-        flash('Please log in to view your cart.', 'warning')
-        return redirect(url_for('login'))
+    cart_items = current_cart_lines()
+    return render_template('cart.html', cart_items=cart_items, totals=cart_totals(cart_items),
+                           max_quantity=MAX_QUANTITY)
+
+@bp.route('/cart/update', methods=['POST'])
+def update_cart():
+    # Quantity inputs are named qty-<product_id>
+    quantities = parse_quantities({
+        key[len('qty-'):]: request.form.get(key, type=int)
+        for key in request.form if key.startswith('qty-')
+    })
+    if quantities is None:
+        flash(f'Please enter whole-number quantities of at most {MAX_QUANTITY}.', 'danger')
+    elif not change_cart(quantities):
+        flash('Your cart is full. Please log in to add more items.', 'warning')
+    else:
+        flash('Cart updated.', 'success')
+    return redirect(url_for('main.cart'))
 
-    cart_items = Cart.query.filter_by(user_id=session['user_id']).all()
-    return render_template('cart.html', cart_items=cart_items)
+@bp.route('/cart/remove/<int:product_id>', methods=['POST'])
+def cart_remove(product_id):
+    change_cart({product_id: 0})
+    flash('Item removed from your cart.', 'success')
+    return redirect(url_for('main.cart'))
 
-@app.route('/delete_item/<int:item_id>', methods=['POST'])
+@bp.route('/delete_item/<int:item_id>', methods=['POST'])
 def delete_item(item_id):
     cart_item = Cart.query.get(item_id)
-    if cart_item and cart_item.user_id == session['user_id']:
+    if cart_item and cart_item.user_id == session.get('user_id'):
         db.session.delete(cart_item)
         db.session.commit()
         flash('Item removed from your cart.', 'success')
     else:
         flash('Item not found in your cart.', 'error')
 
-    return redirect(url_for('cart'))
+    return redirect(url_for('main.cart'))
 
-@app.route('/register', methods=['GET', 'POST'])
+@bp.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
         username = request.form['username']
         email = request.form['email']
         password = request.form['password']
         confirm_password = request.form['confirm_password']
-        hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
 
-        existing_user = User.query.filter_by(email=email).first()
-        if existing_user:
-            flash('Email already registered!', 'danger')
-            return redirect(url_for('register'))
+        # Cheap checks first: only hash a password we are actually going to store
         if confirm_password != password:
             flash('Passwords do not match!', 'danger')
-            return redirect(url_for('register'))
+            return redirect(url_for('main.register'))
+        existing_user = User.query.filter((User.email == email) | (User.username == username)).first()
+        if existing_user:
+            flash('Email already registered!' if existing_user.email == email else 'Username already taken!', 'danger')
+            return redirect(url_for('main.register'))
+
+        try:
+            hashed_password = hash_password(password)
+        except HasherBusy:
+            flash('We are busy right now, please try again in a moment.', 'warning')
+            return render_template('register.html'), 503
 
         new_user = User(username=username, email=email, password=hashed_password)
         db.session.add(new_user)
         db.session.commit()
         flash('Registration successful! You can now log in.', 'success')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
 
     return render_template('register.html')
 
-@app.route('/login', methods=['GET', 'POST'])
+@bp.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         email = request.form['email']
         password = request.form['password']
+
+        # Throttle before the user lookup and the password hash
+        retry_after = check_login(request.remote_addr, email)
+        if retry_after:
+            flash('Too many login attempts. Please wait a moment and try again.', 'danger')
+            response = make_response(render_template('login.html'), 429)
+            response.headers['Retry-After'] = str(math.ceil(retry_after))
+            return response
+
         user = User.query.filter_by(email=email).first()
 
-        if user and check_password_hash(user.password, password):
+        try:
+            matches, new_hash = verify_password(user.password, password) if user else (False, None)
+        except HasherBusy:
+            flash('We are busy right now, please try again in a moment.', 'warning')
+            return render_template('login.html'), 503
+
+        if matches:
+            if new_hash:
+                user.password = new_hash
+                db.session.commit()
+            login_succeeded(email)
+            guest_cart = session.pop('guest_cart', None)
+            if guest_cart:
+                merge_guest_cart(user.id, guest_cart)
             session['user_id'] = user.id
             session['username'] = user.username
             session['role'] = user.role
             flash('Login successful!', 'success')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
 
         flash('Invalid credentials, please try again.', 'danger')
 
     return render_template('login.html')
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 def dashboard():
     if 'user_id' not in session:
         flash('Please log in first.', 'warning')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
 
     return render_template('dashboard.html', username=session['username'], role=session['role'])
-fruits_vegetables_dict = [
-    {'name': 'Apple', 'image': 'apple.png', 'price': '₹130 per each'},
-    {'name': 'Banana', 'image': 'banana.png', 'price': '₹44 per kg'},
-    {'name': 'Mango', 'image': 'mango.png', 'price': '₹100 per kg'},
-    {'name': 'Orange', 'image': 'orange.png', 'price': '₹65 per kg each'},
-    {'name': 'Litchi', 'image': 'litchi.png', 'price': '₹100 per kg'},
-    {'name': 'Kiwi', 'image': 'kiwi.png', 'price': '₹123 (3 pieces)'},
-    {'name': 'DragonFruit', 'image': 'dragonfruit.png', 'price': '₹63 each'},
-    {'name': 'Pineapple', 'image': 'pineapple.png', 'price': '₹93 each'},
-    {'name': 'Strawberry', 'image': 'strawberry.png', 'price': '₹96 (1 pack)'},
-    {'name': 'Grapes', 'image': 'grapes.png', 'price': '₹70 (500g)'},
-    {'name': 'Carrot', 'image': 'carrot.png', 'price': '₹20 per kg'},
-    {'name': 'Pomegranate', 'image': 'pomegranet.png', 'price': '₹115 (500g)'},
-    {'name': 'Watermelon', 'image': 'watermelon.png', 'price': '₹35 each'},
-    {'name': 'Muskmelon', 'image': 'muskmelon.png', 'price': '₹67 each'},
-    {'name': 'Papaya', 'image': 'papaya.png', 'price': '₹111 per kg'},
-     {'name': 'Maggi','image': 'maggi.png','price': '₹10 per each'},
-        {'name': 'Tedhe Medhe','image': 'TedheMedhe.png','price': '₹10 per each'},
-        {'name': "Lay's India's Magic Masala ",'image': 'BlueLays.png','price': '₹10 per each'},
-        {'name': "Lay's Classic Salted ",'image': 'YellowLays.png','price': '₹10 per each'},
-        {'name': "Lay's American Style Cream & Onion  ",'image': 'greenLays.png','price': '₹10 per each'},
-        {'name': "Maggi Cheese Macroni Instant Pasta",'image': 'cheese.png','price': '₹35 per each'},
-        {'name': "Maggi Masala Penne Instant Pasta",'image': 'masala.png','price': '₹35 per each'},
-        {'name': "Oreo",'image': 'oreo.png','price': '₹10 per each'},
-        {'name': "Dark Fantasy ",'image': 'DarkFantasy.png','price': '₹30 '},
-        {'name': "Hide & Seek ",   'image': 'Hide.png','price': '₹30 per each' },
-        {'name': "Jim Jam",'image': 'JimJam.png','price': '₹10 per each'},
-        {'name': "Good Day",'image': 'Gooday.png','price': '₹10 per each'},
-        { 'name': "Little Hearts",'image': 'Hearts.png','price': '₹10 per each'},
-        {'name': "Ferrero Rocher",'image': 'Ferrero.png','price': '₹763 (24 pieces)'},
-        {'name': "Dairy Milk Silk Fruit & Nut",'image': 'FruitNut.png','price': '₹186'},
-        {'name': "Kit Kat",'image': 'Kitkat.png','price': '₹110'},
-        {'name': "Crispello",'image': 'crispello.png','price': '₹40'},
-        {'name': "Munch",'image': 'Munch.png','price': '₹57'},
-        {'name': "ThumsUp",'image': 'ThumsUp.png','price': '₹40 (750ml)'},
-        {'name': "Choco Latte",'image': 'ChocoLatte.png','price': '₹120'},
-        {'name': "Cold Coffee",'image': 'ColdCoffee.png','price': '₹120'},
-        {'name': "Diet Coke",'image': 'diet.png','price': '₹40 (300ml)'},
-        {'name': "Fanta",'image': 'fanta.png','price': '₹40 (750ml)'},
-        {'name': "Sprite",'image': 'sprite.png','price': '₹40 (750ml)'},
-        {'name': "Limca",'image': 'limca.png','price': '₹40 (750ml)'},
-        {'name': "Maza",'image': 'maza.png','price': '₹40 (600ml)'},
-         {'name': "Mountain Dew",'image': 'dew.png','price': '₹86 (2 X 750ml)'},
-        {'name': "Aloo Bhujia",'image': 'bhujia.png','price': '₹221 per kg'},
-        {'name': "Kinder Joy",'image': 'joy.png','price': '₹48'},
-        {'name': "Makhana",'image': 'makhana.png', 'price': '₹160 (100g)'},
-        {'name': "Amul Moti Milk",'image': 'milk.png','price': '₹33 (450ml)'},
-        {'name': "Whole Wheat Bread",'image': 'wheatBread.png','price': '₹60 (400g)'},
-        {'name': "Brown Bread",'image': 'Brown.png','price': '₹55 (400g)'},
-        {'name': "Bonn Pav Bread",'image': 'pav.png','price': '₹45 (250g)'},
-        {'name': "Eggs",'image': 'eggs.png','price': '₹72 (6 pieces)'},
-        {'name': "Kellogg's Corn Flakes",'image': 'flakes.png','price': '₹120 (250g)'},
-        {'name': "Kellogg's Muesli Nuts Delight",'image': 'muesli.png','price': '₹544 (1 kg)'},
-        {'name': "Saffola Masala Veggie Twist Oats",'image': 'oats.png','price': '₹68 (pack of 4)'},
-        {'name': "Mother Dairy Classic Curd",'image': 'curd.png','price': '₹25 (200g)'},
-        {'name': "Amul Salted Butter",'image': 'butter.png','price': '₹60 (100)'},
-        {'name': "Amul Cheese Slices",'image': 'cheeseSlices.png','price': '₹85 (100g)'},
-        {'name': "Amul Fresh Cream",'image': 'cream.png','price': '₹68 (250ml)'},
-        {'name': "Nestle Milkmaid Sweetened Condensed Milk",'image': 'condensedMilk.png','price': '₹140 (380g)'},
-        {'name': "MyFitness Chocolate Crunchy Peanut Butter (227 g)",'image': 'peanutButter.png','price': '₹146 (227g)'},
-        {'name': "Dabur Honey",'image': 'honey.png','price': '₹115 (250g)'},
-        {'name': "Kissan Fresh Tomato Ketchup",'image': 'ketchup.png','price': '₹100 (850g)'},
-        {'name': "Veg Mayonnaise",'image': 'mayo.png','price': '₹49 (100g)'},
-        {'name': "Ching's Secret Schezwan Chutney",'image': 'chutney.png','price': '₹84 (250g)'},
-        {'name': "Hershey's Chocolate Syrup",'image': 'chocoSyrup.png','price': '₹105 (200g)'},
-        {'name': "Smith & Jones Ginger Garlic Paste",'image': 'garlicpaste.png','price': '₹46 (200g)'},
-        {'name': "Vinegar",'image': 'vinegar.png','price': '₹67 (610ml)'},
-        {'name': "Tata Tea Premium Tea",'image': 'tata.png','price': '₹140 (250g)'},
-        {'name': "Brooke Bond Taj Mahal Tea",'image': 'taj.png','price': '₹65 (100g)'},
-        {'name': "Nescafe Classic - Instant Coffee Powder",'image': 'coffee.png','price': '₹230 (45g)'},
-        {'name': "Aashirvaad Shudh Chakki Atta ",'image': 'ashirvad.png','price': '₹238 (5kg)'},
-        {'name': "Fortune Chakki Fresh ",'image': 'fortune.png','price': '₹227 (5kg)'},
-        {'name': "Daawat Rozana Gold Basmati Rice ",'image': 'rice.png','price': '₹415 (5kg)'},
-        {'name': "Whole Farm Grocery Kabuli Chana ",'image': 'chana.png','price': '₹156 (1kg)'}, 
-        {'name': "Whole Farm Premium Kashmiri Red Rajma ",'image': 'rajma.png','price': '₹120 (500g)'},  
-        {'name': "Toor Dal ",'image': 'toor.png','price': '₹198 (1kg)'}, 
-        {'name': "Urad Dal (Chilka)",'image': 'urad.png','price': '₹77 (500g)'}, 
-        {'name': "Brown Chana ",'image': 'brownchana.png','price': '₹66 (500g)'}, 
-        {'name': "Happydent White Spearmint Sugar Free Chewing Gum ",'image': 'happydent.png','price': '₹49'}, 
-        {'name': "Parle Melody Chocolaty Candy",'image': 'melody.png','price': '₹100'}, 
-        {'name': "Lotte Choco Pie",'image': 'pie.png','price': '₹80'}]
-@app.route('/logout')
+@bp.route('/logout')
 def logout():
     session.clear()
     flash('You have been logged out.', 'info')
-    return redirect(url_for('login'))
-@app.errorhandler(404)
+    return redirect(url_for('main.login'))
+@bp.app_errorhandler(404)
 def not_found_error(error):
     return render_template('404.html'), 404
-@app.route('/privacy_policy')
+@bp.route('/privacy_policy')
+@cached_page('privacy.html')
 def policy():
     return render_template('privacy.html')
-@app.route('/faq')
+@bp.route('/faq')
+@cached_page('faq.html')
 def faq():
     return render_template('faq.html')
-@app.route('/terms')
+@bp.route('/terms')
+@cached_page('terms.html')
 def terms():
     return render_template('terms.html')
 # Custom error handler for 500 Internal Server Error
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(error):
     return "An internal error occurred", 500
-@app.route('/search', methods=['GET'])
+def search_results(query, page):
+    # (rendered result list, has next page, spelling correction)
+    results, has_next = search_products(query, page)
+
+    # Nothing matched: retry once with misspelled words corrected
+    correction = None
+    if not results and page == 1 and query:
+        correction = correct_query(query)
+        if correction:
+            results, has_next = search_products(correction, page)
+
+    html = Markup(render_template('_search_results.html', results=results)) if results else Markup()
+    return html, has_next, correction
+
+
+@bp.route('/search', methods=['GET'])
 def search():
-    query = request.args.get('query', '').lower()  
-    if query:
-       results = [product for product in fruits_vegetables_dict if query in product['name'].lower()]
-    else:
-        results = fruits_vegetables_dict
-    
-    return render_template('search_results.html', query=query, results=results)
+    query = request.args.get('query', '')[:MAX_QUERY_LENGTH].strip()
+    page = request.args.get('page', 1, type=int)
+    # Keyed by the words actually searched for, so "Aloo", "aloo " and "aloo!" share an entry
+    key = (bool(query), tuple(query_tokens(query)), page)
+    results, has_next, correction = catalog_fragment('search_cache', key, lambda: search_results(query, page))
+    return render_template('search_results.html', query=query, results=results,
+                           page=page, has_next=has_next, correction=correction)
 
 
 
-@app.route("/product/<int:product_id>")
-def product_detail(product_id):
-    # New route to show individual product details
+@bp.route('/search/suggest', methods=['GET'])
+def search_suggest():
+    # Typeahead for the header search box, answered from memory
+    matches = suggest(request.args.get('q', ''))
+    return jsonify([
+        {'id': product_id, 'name': name, 'url': url_for('main.product_detail', product_id=product_id)}
+        for product_id, name in matches
+    ])
+
+
+ProductSummary = namedtuple('ProductSummary', 'name image info')
+
+
+def product_summary(product_id):
     product = Product.query.get_or_404(product_id)
-    return render_template('product_detail.html', product=product)
+    return ProductSummary(product.name,
+                          get_template_attribute('_product_summary.html', 'image')(product),
+                          get_template_attribute('_product_summary.html', 'info')(product))
+
+
+@bp.route('/img/<int:width>/<path:path>')
+def image_variant(width, path):
+    # Resized on first request, then straight from the disk cache
+    return serve_variant(width, path)
+
+
+@bp.route("/product/<int:product_id>")
+def product_detail(product_id):
+    # Stock is read fresh; name, picture and description come from the fragment cache
+    stock = db.session.execute(db.select(Product.stock).where(Product.id == product_id)).scalar()
+    if stock is None:
+        abort(404)
+    summary = catalog_fragment('fragment_cache', ('product', product_id), lambda: product_summary(product_id))
+    return render_template('product_detail.html', summary=summary, product_id=product_id, stock=stock)
 
 
 
@@ -579,4 +657,7 @@ def product_detail(product_id):
 
 
 if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        init_db()
     app.run(debug=True, port=8080)
\ No newline at end of file
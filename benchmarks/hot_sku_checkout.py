@@ -0,0 +1,101 @@
+# Concurrent checkouts against one hot SKU, on a throwaway SQLite database.
+#
+#   python benchmarks/hot_sku_checkout.py --checkouts 2000 --threads 8 --stock 1500
+#
+# Every checkout is a different user buying one unit of the same product, so each one
+# contends for the product row. Reports checkouts per second and checks that exactly
+# `stock` orders went through and stock never went negative.
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from models import db, Cart, Order, Product, User  # noqa: E402
+from orders import OutOfStock, place_order  # noqa: E402
+from schema import init_db  # noqa: E402
+
+SHIPPING = {'full_name': 'Bench', 'email': 'bench@example.com', 'phone': '0', 'address': '1 Main St',
+            'city': 'Pune', 'state': 'MH', 'zip': '411001', 'country': 'IN'}
+
+
+def setup(app, checkouts, stock):
+    with app.app_context():
+        init_db()
+        product = Product.query.order_by(Product.id).first()
+        product.stock = stock
+        db.session.execute(db.insert(User), [
+            {'username': f'bench{n}', 'email': f'bench{n}@example.com', 'password': '-'}
+            for n in range(checkouts)
+        ])
+        user_ids = db.session.execute(db.select(User.id).where(User.username.like('bench%'))).scalars().all()
+        db.session.execute(db.insert(Cart), [
+            {'user_id': user_id, 'product_id': product.id, 'quantity': 1} for user_id in user_ids
+        ])
+        db.session.commit()
+        return product.id, user_ids
+
+
+def run(app, user_ids, threads):
+    placed, sold_out, failed = [0], [0], [0]
+    lock = threading.Lock()
+    pending = iter(user_ids)
+
+    def worker():
+        with app.app_context():
+            while True:
+                with lock:
+                    user_id = next(pending, None)
+                if user_id is None:
+                    return
+                try:
+                    outcome = placed if place_order(user_id, f'bench-{user_id}', SHIPPING) else failed
+                except OutOfStock:
+                    outcome = sold_out
+                except Exception:
+                    db.session.rollback()
+                    outcome = failed
+                with lock:
+                    outcome[0] += 1
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - started, placed[0], sold_out[0], failed[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--checkouts', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--stock', type=int, default=1500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{directory}/bench.db'})
+        product_id, user_ids = setup(app, args.checkouts, args.stock)
+        elapsed, placed, sold_out, failed = run(app, user_ids, args.threads)
+
+        with app.app_context():
+            stock = db.session.get(Product, product_id).stock
+            orders = Order.query.count()
+            db.engine.dispose()
+
+    print(f'{args.checkouts} checkouts on {args.threads} threads in {elapsed:.2f}s '
+          f'= {args.checkouts / elapsed:.0f} checkouts/s')
+    print(f'placed {placed}, sold out {sold_out}, errors {failed}; '
+          f'orders {orders}, stock left {stock}')
+    expected = min(args.stock, args.checkouts)
+    if placed != expected or orders != expected or stock != args.stock - expected:
+        sys.exit('OVERSOLD or lost orders')
+
+
+if __name__ == '__main__':
+    main()
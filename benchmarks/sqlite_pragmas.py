@@ -0,0 +1,101 @@
+# Mixed read/write throughput on SQLite, with and without the pragma profile.
+#
+#   python benchmarks/sqlite_pragmas.py --seconds 5 --readers 8 --writers 4
+#
+# Readers list category pages; writers add to their own carts. Each run gets a fresh
+# database file, once with SQLite's defaults (rollback journal, no busy_timeout beyond
+# the driver's) and once with database.SQLITE_PRAGMAS.
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from cart import add_items  # noqa: E402
+from database import SQLITE_PRAGMAS  # noqa: E402
+from models import db, Product, User  # noqa: E402
+from schema import init_db  # noqa: E402
+
+CATEGORIES = ('beauty', 'pharmacy', 'fruits_veg', 'snacks')
+
+
+def run(pragmas, seconds, readers, writers):
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{directory}/bench.db',
+                          'SQLITE_PRAGMAS': pragmas, 'STOCK_SWEEP_INTERVAL': 0})
+        with app.app_context():
+            init_db()
+            db.session.execute(db.insert(User), [
+                {'username': f'bench{n}', 'email': f'bench{n}@example.com', 'password': '-'}
+                for n in range(writers)
+            ])
+            db.session.commit()
+            user_ids = db.session.execute(db.select(User.id).where(User.username.like('bench%'))).scalars().all()
+            product_ids = db.session.execute(db.select(Product.id)).scalars().all()
+
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def loop(step):
+            done = errors = 0
+            with app.app_context():
+                n = 0
+                while time.perf_counter() < deadline:
+                    try:
+                        step(n)
+                        done += 1
+                    except Exception:
+                        db.session.rollback()
+                        errors += 1
+                    db.session.remove()
+                    n += 1
+            return done, errors
+
+        def reader(index):
+            def step(n):
+                category = CATEGORIES[(index + n) % len(CATEGORIES)]
+                Product.query.filter_by(category=category).order_by(Product.id).limit(24).all()
+            done, errors = loop(step)
+            with lock:
+                counts['reads'] += done
+                counts['errors'] += errors
+
+        def writer(user_id):
+            def step(n):
+                add_items(user_id, {product_ids[n % len(product_ids)]: 1})
+            done, errors = loop(step)
+            with lock:
+                counts['writes'] += done
+                counts['errors'] += errors
+
+        threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+        threads += [threading.Thread(target=writer, args=(user_id,)) for user_id in user_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with app.app_context():
+            db.engine.dispose()
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    args = parser.parse_args()
+
+    for label, pragmas in (('defaults', {}), ('profile', SQLITE_PRAGMAS)):
+        counts = run(pragmas, args.seconds, args.readers, args.writers)
+        print(f"{label:>8}: {counts['reads'] / args.seconds:8.0f} reads/s "
+              f"{counts['writes'] / args.seconds:8.0f} writes/s {counts['errors']:6d} errors")
+
+
+if __name__ == '__main__':
+    main()
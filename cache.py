@@ -0,0 +1,225 @@
+# In-process caches for rendered HTML. Each worker keeps its own per app, in
+# app.extensions; keys carry everything the output depends on, so entries never need to
+# be invalidated, only evicted. Catalog fragments are keyed by the catalog version,
+# which admin edits bump.
+import functools
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from datetime import datetime, timezone
+from flask import copy_current_request_context, current_app, has_request_context, request, session
+from models import db, CatalogVersion
+
+MAX_ENTRIES = 2000
+MAX_SEARCH_ENTRIES = 200  # Search keys come from visitors, so they get their own, smaller LRU
+MAX_STALE = 30.0  # seconds an out-of-date entry may still be served while it is re-rendered
+VERSION_CHECK_INTERVAL = 1.0  # seconds; how stale another worker's catalog edit can look
+MAX_TRACKED_VERSIONS = 100  # when each recent version was first seen, for superseded_at()
+
+CachedPage = namedtuple('CachedPage', 'body etag last_modified')
+Entry = namedtuple('Entry', 'value version')
+
+
+class Flight:
+    """One call in progress that other callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+
+
+class SingleFlight:
+    """At most one call per key at a time; concurrent callers share its result."""
+
+    def __init__(self):
+        self._flights = {}  # key -> Flight
+        self._lock = threading.Lock()
+
+    def join(self, key):
+        # (flight, True if this caller has to make the call)
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def lead(self, flight, key, function):
+        try:
+            flight.value = function()
+        except BaseException:
+            flight.failed = True
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def do(self, key, function):
+        flight, leader = self.join(key)
+        if leader:
+            return self.lead(flight, key, function)
+        flight.done.wait()
+        return function() if flight.failed else flight.value
+
+
+class RenderCache:
+    """Least-recently-used map of cache key -> rendered output.
+
+    Entries remember the version they were rendered for. A request that finds an older
+    version gets the stale output straight away while a single background render
+    replaces it, until MAX_STALE seconds after that version was superseded; after that
+    it waits for the render.
+    Concurrent misses for one key share a single render instead of each doing their own.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_stale=MAX_STALE):
+        self._entries = OrderedDict()  # key -> Entry
+        self._renders = SingleFlight()  # keyed by (key, version)
+        self._max_entries = max_entries
+        self._max_stale = max_stale
+        self._lock = threading.Lock()
+
+    def _get(self, key, version, superseded_at):
+        # (entry, may serve it while refreshing)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(key)
+        if entry.version == version or superseded_at is None:
+            return entry, False
+        return entry, time.monotonic() - superseded_at(entry.version) <= self._max_stale
+
+    def _set(self, key, value, version):
+        with self._lock:
+            self._entries[key] = Entry(value, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _render(self, key, render, version):
+        value = render()
+        self._set(key, value, version)
+        return value
+
+    def _refresh_in_background(self, key, render, version):
+        flight, leader = self._renders.join((key, version))
+        if not leader:
+            return
+        app = current_app._get_current_object()
+
+        def refresh():
+            try:
+                self._renders.lead(flight, (key, version), lambda: self._render(key, render, version))
+            except Exception:
+                app.logger.exception('Refreshing cached %r failed', key)
+
+        # The render may use url_for, db.session and templates, so it runs in a copy of
+        # this request's context
+        if has_request_context():
+            refresh = copy_current_request_context(refresh)
+        threading.Thread(target=refresh, name='cache-refresh', daemon=True).start()
+
+    def get_or_render(self, key, render, version=None, superseded_at=None):
+        # superseded_at(old_version) -> time.monotonic() when a newer version appeared
+        entry, serve_stale = self._get(key, version, superseded_at)
+        if entry is not None and entry.version == version:
+            return entry.value
+        if serve_stale:
+            self._refresh_in_background(key, render, version)
+            return entry.value
+        return self._renders.do((key, version), lambda: self._render(key, render, version))
+
+
+class VersionCounter:
+    """The catalog version, re-read from its row at most once per VERSION_CHECK_INTERVAL.
+
+    on_change runs when another worker has edited the catalog; versions this worker
+    bumped to itself don't count, since its own edits were already applied in place.
+    """
+
+    def __init__(self, on_change=None):
+        self._version = None
+        self._checked_at = 0.0
+        self._on_change = on_change
+        self._own = set()  # versions bumped to by this worker and not yet seen by current()
+        self._seen_at = deque(maxlen=MAX_TRACKED_VERSIONS)  # (version, time first seen), oldest first
+
+    def _read(self):
+        return db.session.execute(
+            db.select(CatalogVersion.version).where(CatalogVersion.id == 1)).scalar() or 0
+
+    def current(self):
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= VERSION_CHECK_INTERVAL:
+            version = self._read()
+            if self._version is not None and version != self._version and self._on_change:
+                if not all(seen in self._own for seen in range(self._version + 1, version + 1)):
+                    self._on_change()
+            if self._version is not None and version != self._version:
+                self._seen_at.append((version, now))
+            self._own = {own for own in self._own if own > version}
+            self._version, self._checked_at = version, now
+        return self._version
+
+    def superseded_at(self, version):
+        # When this worker first saw a version newer than `version`; -inf if too long ago to tell
+        for seen, seen_at in tuple(self._seen_at):
+            if seen > version:
+                return seen_at
+        return float('-inf')
+
+    def bump(self):
+        # Call inside the transaction that changes the catalog, before it commits
+        db.session.execute(db.update(CatalogVersion).where(CatalogVersion.id == 1)
+                           .values(version=CatalogVersion.version + 1))
+        self._own = self._own | {self._read()}
+        self._checked_at = 0.0  # this worker sees its own edit on the next request
+
+
+def catalog_version():
+    return current_app.extensions['catalog_version']
+
+
+def catalog_fragment(cache, key, render):
+    # Output of render() from the named cache, re-rendered once the catalog changes
+    version = catalog_version()
+    return current_app.extensions[cache].get_or_render(key, render, version.current(), version.superseded_at)
+
+
+def template_mtimes(templates):
+    folder = os.path.join(current_app.root_path, current_app.template_folder)
+    return tuple(os.stat(os.path.join(folder, name)).st_mtime_ns for name in templates)
+
+
+def cached_page(*templates):
+    # For views whose HTML depends only on `templates` and on whether the visitor is
+    # logged in, which is all base.html branches on. Pending flash messages would be
+    # rendered into the page, so those requests skip the cache.
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if '_flashes' in session:
+                return view(*args, **kwargs)
+
+            mtimes = template_mtimes(templates)
+            key = (request.endpoint, bool(session.get('user_id')), mtimes)
+
+            def render():
+                body = view(*args, **kwargs).encode()
+                return CachedPage(body, hashlib.sha256(body).hexdigest()[:32],
+                                  datetime.fromtimestamp(max(mtimes) // 10**9, timezone.utc))
+
+            page = current_app.extensions['page_cache'].get_or_render(key, render)
+            response = current_app.response_class(page.body, mimetype='text/html')
+            response.set_etag(page.etag)
+            response.last_modified = page.last_modified
+            response.cache_control.no_cache = True  # revalidate; the answer is usually a 304
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
@@ -0,0 +1,135 @@
+# Cart storage: one row per (user, product), written with single-statement upserts.
+# Guests keep a compact {"<product_id>": quantity} dict in the signed session cookie
+# instead, which is merged into the Cart table when they log in.
+from collections import namedtuple
+from sqlalchemy.orm import joinedload
+from catalog import format_money
+from database import upsert_insert
+from models import db, Cart, Product
+
+MAX_BATCH = 500
+MAX_QUANTITY = 99  # Per cart line
+MAX_ID = 2 ** 63 - 1  # Largest id an INTEGER / BIGINT column can hold
+MAX_GUEST_LINES = 50  # Keeps the session cookie well under 4 KB
+
+GuestLine = namedtuple('GuestLine', 'product_id product quantity')
+
+
+def add_items(user_id, quantities):
+    # INSERT ... ON CONFLICT DO UPDATE: one statement, and concurrent adds can't
+    # create duplicate rows or lose an increment; totals stop at MAX_QUANTITY
+    statement = upsert_insert(db.engine)(Cart).values([
+        {'user_id': user_id, 'product_id': product_id, 'quantity': quantity}
+        for product_id, quantity in quantities.items()
+    ])
+    total = Cart.quantity + statement.excluded.quantity
+    statement = statement.on_conflict_do_update(
+        index_elements=[Cart.user_id, Cart.product_id],
+        set_={'quantity': db.case((total > MAX_QUANTITY, MAX_QUANTITY), else_=total)},
+    )
+    db.session.execute(statement)
+    db.session.commit()
+
+
+def apply_quantities(user_id, quantities):
+    # {product_id: quantity} in one transaction: one multi-row upsert for the lines
+    # being set and one DELETE for the lines going to zero
+    upserts = [
+        {'user_id': user_id, 'product_id': product_id, 'quantity': quantity}
+        for product_id, quantity in quantities.items() if quantity > 0
+    ]
+    removals = [product_id for product_id, quantity in quantities.items() if quantity <= 0]
+    if upserts:
+        statement = upsert_insert(db.engine)(Cart).values(upserts)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Cart.user_id, Cart.product_id],
+            set_={'quantity': statement.excluded.quantity},
+        )
+        db.session.execute(statement)
+    if removals:
+        Cart.query.filter(Cart.user_id == user_id, Cart.product_id.in_(removals)).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def cart_lines(user_id):
+    # Cart rows with their products in one joined SELECT, instead of one lazy load per line
+    return (Cart.query.options(joinedload(Cart.product, innerjoin=True))
+            .filter_by(user_id=user_id).order_by(Cart.id).all())
+
+
+def guest_update(cart, quantities, increment=False):
+    # New guest cart dict, or None if it would grow past MAX_GUEST_LINES
+    cart = {str(product_id): quantity for product_id, quantity in guest_quantities(cart).items()}
+    for product_id, quantity in quantities.items():
+        key = str(product_id)
+        if increment:
+            quantity += cart.get(key, 0)
+        if quantity > 0:
+            cart[key] = min(quantity, MAX_QUANTITY)
+        else:
+            cart.pop(key, None)
+    return cart if len(cart) <= MAX_GUEST_LINES else None
+
+
+def guest_quantities(cart):
+    # {product_id: quantity} from a guest cookie, dropping malformed entries and
+    # clamping quantities written before MAX_QUANTITY existed
+    if not isinstance(cart, dict):
+        return {}
+    quantities = {}
+    for key, quantity in cart.items():
+        if not isinstance(key, str) or not key.isascii() or not key.isdigit():
+            continue
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity < 1:
+            continue
+        if 0 < int(key) <= MAX_ID:
+            quantities[int(key)] = min(quantity, MAX_QUANTITY)
+    return quantities
+
+
+def guest_lines(cart):
+    # Same shape as Cart rows for the templates; one IN query for the products
+    quantities = guest_quantities(cart)
+    if not quantities:
+        return []
+    products = {product.id: product for product in Product.query.filter(Product.id.in_(quantities))}
+    return [
+        GuestLine(product_id, products[product_id], quantity)
+        for product_id, quantity in quantities.items() if product_id in products
+    ]
+
+
+def merge_guest_cart(user_id, cart):
+    # Fold a guest cart into the user's rows with one bulk upsert
+    lines = guest_lines(cart)
+    if lines:
+        add_items(user_id, {line.product_id: line.quantity for line in lines})
+
+
+def cart_totals(cart_items):
+    # Integer minor-unit totals, one per currency in the cart
+    totals = {}
+    for item in cart_items:
+        totals[item.product.currency] = totals.get(item.product.currency, 0) + item.product.price_minor * item.quantity
+    return sorted(totals.items())
+
+
+def cart_summary(lines):
+    # Mini-cart payload for the JSON API
+    return {
+        'items': [
+            {
+                'product_id': line.product_id,
+                'name': line.product.name,
+                'quantity': line.quantity,
+                'price': line.product.price,
+                'subtotal': format_money(line.product.price_minor * line.quantity, line.product.currency),
+            }
+            for line in lines
+        ],
+        'count': sum(line.quantity for line in lines),
+        'totals': [
+            {'currency': currency, 'amount': amount, 'display': format_money(amount, currency)}
+            for currency, amount in cart_totals(lines)
+        ],
+    }
@@ -0,0 +1,197 @@
+# Seed data for the product catalog, grouped by category.
+# Loaded into the Product table once; views read it back through indexed queries.
+import re
+
+# Prices are stored as integer minor units (cents / paise) plus an ISO currency.
+CURRENCY_SYMBOLS = {'USD': '$', 'INR': '₹', 'EUR': '€', 'GBP': '£'}
+SYMBOL_CURRENCIES = {symbol: code for code, symbol in CURRENCY_SYMBOLS.items()}
+
+PRICE_PATTERN = re.compile(r'^\s*(?P<symbol>[$₹€£])\s*(?P<amount>\d[\d,]*(?:\.\d{1,2})?)\s*(?P<unit>.*?)\s*$')
+
+
+def parse_price(text):
+    # "$12.99" -> (1299, 'USD', None); "₹70 (500g)" -> (7000, 'INR', '500g')
+    match = PRICE_PATTERN.match(text or '')
+    if not match:
+        raise ValueError(f"Unrecognised price: {text!r}")
+    whole, _, fraction = match.group('amount').replace(',', '').partition('.')
+    amount = int(whole) * 100 + int(fraction.ljust(2, '0') or 0)
+    unit = match.group('unit').strip('()').strip() or None
+    return amount, SYMBOL_CURRENCIES[match.group('symbol')], unit
+
+
+def format_money(amount, currency):
+    symbol = CURRENCY_SYMBOLS.get(currency, currency + ' ')
+    whole, cents = divmod(amount, 100)
+    return f"{symbol}{whole:,}" if not cents else f"{symbol}{whole:,}.{cents:02d}"
+
+
+def format_price(amount, currency, unit=None):
+    price = format_money(amount, currency)
+    if not unit:
+        return price
+    if unit.startswith('per ') or unit == 'each':
+        return f"{price} {unit}"
+    return f"{price} ({unit})"
+
+
+BEAUTY = [
+    {'name': 'Sol de Janeiro Beija Flor Jet Set', 'price': '$32', 'image': 'static/images/product1.webp'},
+    {'name': 'Charlotte Tilbury Beauty Pillow Talk Mini Pillow Talk lipstick and more', 'price': '$25', 'image': 'static/images/product2.webp'},
+    {'name': 'Sol de Janeiro Bom Dia Bright Jet set', 'price': '$33', 'image': 'static/images/product3.jpg'},
+    {'name': 'Glow Recipe Fruit Babies Bestsellers Kit', 'price': '$250', 'image': 'static/images/product4.jpeg'},
+    {'name': 'Fenty Beauty Pro Filtr Soft Matte Longwear Foundation', 'price': '$38', 'image': 'static/images/product5.jpeg'},
+    {'name': 'Urban Decay Naked3 Eyeshadow Palette', 'price': '$54', 'image': 'static/images/product6.jpeg'},
+    {'name': 'Anastasia Beverly Hills Brow Wiz', 'price': '$21', 'image': 'static/images/product7.jpeg'},
+    {'name': 'Too Faced Better Mascara', 'price': '$25', 'image': 'static/images/product8.jpeg'},
+    {'name': 'MAC Cosmetics Matte Lipstick', 'price': '$19', 'image': 'static/images/product9.jpeg'},
+    {'name': 'Tarte Shape Tape Concealer', 'price': '$27', 'image': 'static/images/product10.jpeg'},
+    {'name': 'Maybelline Fit Me Matte + Poreless Foundation', 'price': '$10', 'image': 'static/images/product11.jpeg'},
+    {'name': 'Huda Beauty Desert Dusk Palette', 'price': '$65', 'image': 'static/images/product12.jpeg'},
+    {'name': 'NARS Radiant Creamy Concealer', 'price': '$30', 'image': 'static/images/product13.jpeg'},
+    {'name': 'Fenty Beauty Killawatt Freestyle Highlighter', 'price': '$36', 'image': 'static/images/product14.jpeg'},
+    {'name': 'L`Oréal Paris Voluminous Lash Paradise Mascara', 'price': '$12', 'image': 'static/images/product15.jpeg'},
+    {'name': 'Benefit Cosmetics Hoola Matte Bronzer', 'price': '$30', 'image': 'static/images/product16.jpeg'},
+    {'name': 'Charlotte Tilbury Airbrush Flawless Finish Powder', 'price': '$45', 'image': 'static/images/product17.jpeg'},
+    {'name': 'Becca Shimmering Skin Perfector Pressed Highlighter', 'price': '$38', 'image': 'static/images/product18.jpeg'},
+    {'name': 'IT Cosmetics Your Skin But Better CC+ Cream', 'price': '$39', 'image': 'static/images/product19.jpeg'},
+    {'name': 'Tatcha The Dewy Skin Cream', 'price': '$68', 'image': 'static/images/product20.jpeg'},
+]
+
+PHARMACY = [
+    {'name': 'Pain Reliever Tablet', 'price': '$12.99', 'image': 'static/images/painrelif.jpg', 'expiry': '12/2026'},
+    {'name': 'Cough Syrup', 'price': '$8.50', 'image': 'static/images/cough.jpg', 'expiry': '03/2025'},
+    {'name': 'Multivitamin Capsules', 'price': '$15.75', 'image': 'static/images/multivitamin.jpg', 'expiry': '11/2027'},
+    {'name': 'Antibiotic Ointment', 'price': '$5.99', 'image': 'static/images/onitment.jpg', 'expiry': '08/2024'},
+    {'name': 'Cold Relief Capsules', 'price': '$10.30', 'image': 'static/images/cold.jpg', 'expiry': '06/2025'},
+    {'name': 'Allergy Relief Tablets', 'price': '$7.99', 'image': 'static/images/allergy.jpg', 'expiry': '09/2025'},
+    {'name': 'Digestive Aid Tablets', 'price': '$6.50', 'image': 'static/images/digestive.jpg', 'expiry': '07/2026'},
+    {'name': 'Vitamin D3 Supplement', 'price': '$9.00', 'image': 'static/images/vitamind33.jpg', 'expiry': '04/2027'},
+    {'name': 'Antacid Tablets', 'price': '$3.75', 'image': 'static/images/amtacid.jpg', 'expiry': '01/2025'},
+    {'name': 'Headache Relief Gel', 'price': '$4.99', 'image': 'static/images/haedache.jpg', 'expiry': '05/2026'},
+    {'name': 'Hair Growth Shampoo', 'price': '$12.00', 'image': 'static/images/hair.jpg', 'expiry': '02/2027'},
+    {'name': 'Sleep Aid Tablets', 'price': '$8.40', 'image': 'static/images/sleep.jpg', 'expiry': '12/2025'},
+    {'name': 'Band-Aids', 'price': '$2.99', 'image': 'static/images/bandaid.jpg', 'expiry': '10/2026'},
+    {'name': 'Eye Drops', 'price': '$5.50', 'image': 'static/images/eyedrops.jpg', 'expiry': '01/2025'},
+    {'name': 'Muscle Relief Cream', 'price': '$7.25', 'image': 'static/images/muscle.jpg', 'expiry': '08/2025'},
+    {'name': 'Moisturizing Lotion', 'price': '$6.80', 'image': 'static/images/moisturizing.jpg', 'expiry': '03/2025'},
+    {'name': 'Thermometer', 'price': '$15.99', 'image': 'static/images/allergy.jpg', 'expiry': '06/2027'},
+    {'name': 'Sunscreen Lotion', 'price': '$12.99', 'image': 'static/images/sunscreen.jpg', 'expiry': '09/2026'},
+    {'name': 'First Aid Kit', 'price': '$25.00', 'image': 'static/images/firstaid.jpg', 'expiry': '07/2027'},
+    {'name': 'Cold Compress', 'price': '$8.50', 'image': 'static/images/compress.jpg', 'expiry': '11/2026'},
+]
+
+FRUITS_VEG = [
+    {'name': 'Apple', 'price': '₹130 per each', 'image': 'static/images/apple.png'},
+    {'name': 'Banana', 'price': '₹44 per kg', 'image': 'static/images/banana.png'},
+    {'name': 'Mango', 'price': '₹100 per kg', 'image': 'static/images/mango.png'},
+    {'name': 'Orange', 'price': '₹65 per kg each', 'image': 'static/images/orange.png'},
+    {'name': 'Litchi', 'price': '₹100 per kg', 'image': 'static/images/litchi.png'},
+    {'name': 'Kiwi', 'price': '₹123 (3 pieces)', 'image': 'static/images/kiwi.png'},
+    {'name': 'DragonFruit', 'price': '₹63 each', 'image': 'static/images/dragonfruit.png'},
+    {'name': 'Pineapple', 'price': '₹93 each', 'image': 'static/images/pineapple.png'},
+    {'name': 'Strawberry', 'price': '₹96 (1 pack)', 'image': 'static/images/strawberry.png'},
+    {'name': 'Grapes', 'price': '₹70 (500g)', 'image': 'static/images/grapes.png'},
+    {'name': 'Carrot', 'price': '₹20 per kg', 'image': 'static/images/carrot.png'},
+    {'name': 'Pomegranate', 'price': '₹115 (500g)', 'image': 'static/images/pomegranet.png'},
+    {'name': 'Watermelon', 'price': '₹35 each', 'image': 'static/images/watermelon.png'},
+    {'name': 'Muskmelon', 'price': '₹67 each', 'image': 'static/images/muskmelon.png'},
+    {'name': 'Papaya', 'price': '₹111 per kg', 'image': 'static/images/papaya.png'},
+    {'name': 'Guava', 'price': '₹120 per kg', 'image': 'static/images/guava.png'},
+    {'name': 'Potato', 'price': '₹30 per kg', 'image': 'static/images/potato.png'},
+    {'name': 'Tomato', 'price': '₹40 per kg', 'image': 'static/images/tomato.png'},
+    {'name': 'Green Chilli', 'price': '₹14 (100g)', 'image': 'static/images/greenChilli.png'},
+    {'name': 'Cauliflower', 'price': '₹15 each', 'image': 'static/images/cauliflower.png'},
+    {'name': 'Ginger', 'price': '₹23 (100g)', 'image': 'static/images/ginger.png'},
+    {'name': 'Capsicum', 'price': '₹80 per kg', 'image': 'static/images/capsicum.png'},
+    {'name': 'Mushroom', 'price': '₹50 (200g)', 'image': 'static/images/mushroom.png'},
+    {'name': 'Garlic', 'price': '₹85 (200g)', 'image': 'static/images/garlic.png'},
+    {'name': 'Cucumber', 'price': '₹30 per kg', 'image': 'static/images/cucumber.png'},
+    {'name': 'Beans', 'price': '₹29 (200g)', 'image': 'static/images/beans.png'},
+    {'name': 'Raddish', 'price': '₹30 per kg', 'image': 'static/images/raddish.png'},
+    {'name': 'Lemon', 'price': '₹30 (220g)', 'image': 'static/images/lemon.png'},
+    {'name': 'Broccoli', 'price': '₹25 (300g)', 'image': 'static/images/broccoli.png'},
+    {'name': 'Onion', 'price': '₹50 per kg', 'image': 'static/images/onion.png'},
+]
+
+SNACKS = [
+    {'name': 'Maggi', 'price': '₹10 per each', 'image': 'static/images/maggi.png'},
+    {'name': 'Tedhe Medhe', 'price': '₹10 per each', 'image': 'static/images/TedheMedhe.png'},
+    {'name': "Lay's India's Magic Masala", 'price': '₹10 per each', 'image': 'static/images/BlueLays.png'},
+    {'name': "Lay's Classic Salted", 'price': '₹10 per each', 'image': 'static/images/YellowLays.png'},
+    {'name': "Lay's American Style Cream & Onion", 'price': '₹10 per each', 'image': 'static/images/greenLays.png'},
+    {'name': 'Maggi Cheese Macroni Instant Pasta', 'price': '₹35 per each', 'image': 'static/images/cheese.png'},
+    {'name': 'Maggi Masala Penne Instant Pasta', 'price': '₹35 per each', 'image': 'static/images/masala.png'},
+    {'name': 'Oreo', 'price': '₹10 per each', 'image': 'static/images/oreo.png'},
+    {'name': 'Dark Fantasy', 'price': '₹30', 'image': 'static/images/DarkFantasy.png'},
+    {'name': 'Hide & Seek', 'price': '₹30 per each', 'image': 'static/images/Hide.png'},
+    {'name': 'Jim Jam', 'price': '₹10 per each', 'image': 'static/images/JimJam.png'},
+    {'name': 'Good Day', 'price': '₹10 per each', 'image': 'static/images/Gooday.png'},
+    {'name': 'Little Hearts', 'price': '₹10 per each', 'image': 'static/images/hearts.png'},
+    {'name': 'Ferrero Rocher', 'price': '₹763 (24 pieces)', 'image': 'static/images/Ferrero.png'},
+    {'name': 'Dairy Milk Silk Fruit & Nut', 'price': '₹186', 'image': 'static/images/FruitNut.png'},
+    {'name': 'Kit Kat', 'price': '₹110', 'image': 'static/images/KitKat.png'},
+    {'name': 'Crispello', 'price': '₹40', 'image': 'static/images/crispello.png'},
+    {'name': 'Munch', 'price': '₹57', 'image': 'static/images/Munch.png'},
+    {'name': 'ThumsUp', 'price': '₹40 (750ml)', 'image': 'static/images/ThumsUp.png'},
+    {'name': 'Choco Latte', 'price': '₹120', 'image': 'static/images/ChocoLatte.png'},
+    {'name': 'Cold Coffee', 'price': '₹120', 'image': 'static/images/ColdCoffee.png'},
+    {'name': 'Diet Coke', 'price': '₹40 (300ml)', 'image': 'static/images/diet.png'},
+    {'name': 'Fanta', 'price': '₹40 (750ml)', 'image': 'static/images/fanta.png'},
+    {'name': 'Sprite', 'price': '₹40 (750ml)', 'image': 'static/images/sprite.png'},
+    {'name': 'Limca', 'price': '₹40 (750ml)', 'image': 'static/images/limca.png'},
+    {'name': 'Maza', 'price': '₹40 (600ml)', 'image': 'static/images/maza.png'},
+    {'name': 'Mountain Dew', 'price': '₹86 (2 X 750ml)', 'image': 'static/images/dew.png'},
+    {'name': 'Aloo Bhujia', 'price': '₹221 per kg', 'image': 'static/images/bhujia.png'},
+    {'name': 'Kinder Joy', 'price': '₹48', 'image': 'static/images/joy.png'},
+    {'name': 'Makhana', 'price': '₹160 (100g)', 'image': 'static/images/makhana.png'},
+]
+
+ESSENTIALS = [
+    {'name': 'Amul Moti Milk', 'price': '$0.40 (450ml)', 'image': 'static/images/milk.png'},
+    {'name': 'Whole Wheat Bread', 'price': '$0.72 (400g)', 'image': 'static/images/wheatBread.png'},
+    {'name': 'Brown Bread', 'price': '$0.66 (400g)', 'image': 'static/images/Brown.png'},
+    {'name': 'Bonn Pav Bread', 'price': '$0.54 (250g)', 'image': 'static/images/Pav.png'},
+    {'name': 'Eggs', 'price': '$0.86 (6 pieces)', 'image': 'static/images/eggs.png'},
+    {'name': "Kellogg's Corn Flakes", 'price': '$1.44 (250g)', 'image': 'static/images/flakes.png'},
+    {'name': "Kellogg's Muesli Nuts Delight", 'price': '$6.53 (1 kg)', 'image': 'static/images/muesli.png'},
+    {'name': 'Saffola Masala Veggie Twist Oats', 'price': '$0.82 (pack of 4)', 'image': 'static/images/oats.png'},
+    {'name': 'Mother Dairy Classic Curd', 'price': '$0.30 (200g)', 'image': 'static/images/curd.png'},
+    {'name': 'Amul Salted Butter', 'price': '$0.72 (100g)', 'image': 'static/images/butter.png'},
+    {'name': 'Amul Cheese Slices', 'price': '$1.02 (100g)', 'image': 'static/images/cheeseSlices.png'},
+    {'name': 'Amul Fresh Cream', 'price': '$0.82 (250ml)', 'image': 'static/images/cream.png'},
+    {'name': 'Nestle Milkmaid Sweetened Condensed Milk', 'price': '$1.68 (380g)', 'image': 'static/images/condensedMilk.png'},
+    {'name': 'MyFitness Chocolate Crunchy Peanut Butter (227 g)', 'price': '$1.75 (227g)', 'image': 'static/images/peanutButter.png'},
+    {'name': 'Dabur Honey', 'price': '$1.38 (250g)', 'image': 'static/images/honey.png'},
+    {'name': 'Kissan Fresh Tomato Ketchup', 'price': '$1.20 (850g)', 'image': 'static/images/ketchup.png'},
+    {'name': 'Veg Mayonnaise', 'price': '$0.59 (100g)', 'image': 'static/images/mayo.png'},
+    {'name': "Ching's Secret Schezwan Chutney", 'price': '$1.01 (250g)', 'image': 'static/images/chutney.png'},
+    {'name': "Hershey's Chocolate Syrup", 'price': '$1.26 (200g)', 'image': 'static/images/chocoSyrup.png'},
+    {'name': 'Smith & Jones Ginger Garlic Paste', 'price': '$0.55 (200g)', 'image': 'static/images/garlicpaste.png'},
+    {'name': 'Vinegar', 'price': '$0.80 (610ml)', 'image': 'static/images/vinegar.png'},
+    {'name': 'Tata Tea Premium Tea', 'price': '$1.68 (250g)', 'image': 'static/images/tata.png'},
+    {'name': 'Brooke Bond Taj Mahal Tea', 'price': '$0.78 (100g)', 'image': 'static/images/taj.png'},
+    {'name': 'Nescafe Classic - Instant Coffee Powder', 'price': '$2.76 (45g)', 'image': 'static/images/coffee.png'},
+    {'name': 'Aashirvaad Shudh Chakki Atta', 'price': '$2.86 (5kg)', 'image': 'static/images/ashirvad.png'},
+    {'name': 'Fortune Chakki Fresh', 'price': '$2.72 (5kg)', 'image': 'static/images/fortune.png'},
+    {'name': 'Daawat Rozana Gold Basmati Rice', 'price': '$4.98 (5kg)', 'image': 'static/images/rice.png'},
+    {'name': 'Whole Farm Grocery Kabuli Chana', 'price': '$1.87 (1kg)', 'image': 'static/images/chana.png'},
+    {'name': 'Whole Farm Premium Kashmiri Red Rajma', 'price': '$1.44 (500g)', 'image': 'static/images/rajma.png'},
+    {'name': 'Toor Dal', 'price': '$2.38 (1kg)', 'image': 'static/images/toor.png'},
+    {'name': 'Urad Dal (Chilka)', 'price': '$0.92 (500g)', 'image': 'static/images/urad.png'},
+    {'name': 'Brown Chana', 'price': '$0.79 (500g)', 'image': 'static/images/brownchana.png'},
+    {'name': 'Happydent White Spearmint Sugar Free Chewing Gum', 'price': '$0.59', 'image': 'static/images/happydent.png'},
+    {'name': 'Parle Melody Chocolaty Candy', 'price': '$1.20', 'image': 'static/images/melody.png'},
+    {'name': 'Lotte Choco Pie', 'price': '$0.96', 'image': 'static/images/pie.png'},
+]
+
+SEED_PRODUCTS = {
+    'beauty': BEAUTY,
+    'pharmacy': PHARMACY,
+    'fruits_veg': FRUITS_VEG,
+    'snacks': SNACKS,
+    'essentials': ESSENTIALS,
+}
+
+# Units on hand for seeded products, and for products that predate stock tracking
+DEFAULT_STOCK = 100
@@ -0,0 +1,91 @@
+# Engine setup: which database to use, connection pool sizing, and on SQLite the pragma
+# profile that every pooled connection gets when it is opened.
+#
+# SQLite in app.db is the zero-setup default. Set DATABASE_URL (e.g.
+# postgresql+psycopg://shop@localhost/shop, with psycopg installed) to use PostgreSQL.
+import os
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+
+# WAL lets readers carry on while the single writer commits; busy_timeout makes a writer
+# wait for the lock instead of failing with "database is locked"; synchronous=NORMAL is
+# safe in WAL mode (a power cut can lose the last commits, never corrupt the file).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,  # ms
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,  # bytes of the file read through the OS page cache
+    'cache_size': -64 * 1024,  # negative means KiB: 64 MiB of page cache per connection
+    'temp_store': 'MEMORY',
+}
+
+POOL_SIZE = 10
+MAX_OVERFLOW = 10
+POOL_RECYCLE = 1800  # seconds; replace connections before a server or proxy drops them
+POOL_PRE_PING = False  # worth turning on for a network database
+STATEMENT_CACHE_SIZE = 500  # compiled SQL statements kept per engine
+
+
+def flag(value):
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+# Settings that can come from the environment, and how to parse them
+ENV_SETTINGS = {
+    'DB_POOL_SIZE': int,
+    'DB_MAX_OVERFLOW': int,
+    'DB_POOL_RECYCLE': int,
+    'DB_POOL_PRE_PING': flag,
+    'DB_STATEMENT_CACHE_SIZE': int,
+}
+
+# Both dialects spell INSERT ... ON CONFLICT the same way
+UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def database_config(default_uri, environ=os.environ):
+    uri = environ.get('DATABASE_URL', default_uri)
+    if uri.startswith('postgres://'):
+        # Hosting providers still hand these out; SQLAlchemy only accepts postgresql://
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    config = {
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLITE_PRAGMAS': SQLITE_PRAGMAS,
+        'DB_POOL_SIZE': POOL_SIZE,
+        'DB_MAX_OVERFLOW': MAX_OVERFLOW,
+        'DB_POOL_RECYCLE': POOL_RECYCLE,
+        'DB_POOL_PRE_PING': POOL_PRE_PING,
+        'DB_STATEMENT_CACHE_SIZE': STATEMENT_CACHE_SIZE,
+    }
+    for key, parse in ENV_SETTINGS.items():
+        if key in environ:
+            config[key] = parse(environ[key])
+    return config
+
+
+def engine_options(config):
+    options = {'query_cache_size': config['DB_STATEMENT_CACHE_SIZE']}
+    # In-memory SQLite gets Flask-SQLAlchemy's single shared connection, which has no pool to size
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return options
+    options.update(pool_size=config['DB_POOL_SIZE'], max_overflow=config['DB_MAX_OVERFLOW'],
+                   pool_recycle=config['DB_POOL_RECYCLE'], pool_pre_ping=config['DB_POOL_PRE_PING'])
+    return options
+
+
+def upsert_insert(engine):
+    return UPSERT_INSERTS[engine.dialect.name]
+
+
+def apply_pragmas(engine, pragmas):
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
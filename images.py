@@ -0,0 +1,316 @@
+# Product image variants. `flask build-images` resizes everything under static/images to
+# card and detail widths (plus 2x for dense screens), writes AVIF/WebP when Pillow can
+# encode them and a JPEG or PNG fallback, and records the files in a manifest. The
+# picture() template helper turns a product's image path into a <picture> element from
+# that manifest. Images the build hasn't seen, such as ones an admin pointed a product
+# at later, go through /img/<width>/<path> instead, which resizes on first request and
+# keeps the result in a size-bounded disk cache.
+import functools
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from flask import abort, current_app, request, send_file, url_for
+from markupsafe import Markup
+from werkzeug.utils import safe_join
+from cache import SingleFlight
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Optional: only building the variants needs Pillow
+    Image = ImageOps = None
+
+SOURCE_DIR = 'images'
+BUILD_DIR = 'build/images'  # under static/, git-ignored
+MANIFEST = 'manifest.json'
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+VARIANTS = {'card': 200, 'detail': 400}  # CSS pixel widths
+DENSITIES = (1, 2)
+# Only these widths are resized on demand, so the disk cache can't be filled with junk sizes
+ON_DEMAND_WIDTHS = frozenset(width * density for width in VARIANTS.values() for density in DENSITIES)
+IMAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+IMAGE_MAX_AGE = 365 * 24 * 3600  # URLs from picture() carry the source's mtime
+
+# Modern formats first; browsers take the first <source> they support
+MODERN_FORMATS = ('avif', 'webp')
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+SAVE_OPTIONS = {
+    'avif': {'format': 'AVIF', 'quality': 50},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+    'png': {'format': 'PNG', 'optimize': True},
+}
+
+
+def has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def encoders():
+    # AVIF needs Pillow 11.3+ or the pillow-avif-plugin; WebP needs libwebp
+    extensions = Image.registered_extensions()
+    return [name for name in MODERN_FORMATS
+            if f'.{EXTENSIONS[name]}' in extensions and SAVE_OPTIONS[name]['format'] in Image.SAVE]
+
+
+def encode(image, name):
+    buffer = io.BytesIO()
+    image.save(buffer, **SAVE_OPTIONS[name])
+    return buffer.getvalue()
+
+
+def build_images(static_folder):
+    # Returns (source images, files written). Unchanged sources keep their hashed files.
+    if Image is None:
+        raise RuntimeError('Pillow is required to build images: pip install Pillow')
+
+    source_dir = os.path.join(static_folder, SOURCE_DIR)
+    build_dir = os.path.join(static_folder, BUILD_DIR)
+    os.makedirs(build_dir, exist_ok=True)
+    formats = encoders()
+    manifest, keep, written = {}, {MANIFEST}, 0
+
+    for filename in sorted(os.listdir(source_dir)):
+        stem, extension = os.path.splitext(filename)
+        if extension.lower() not in SOURCE_EXTENSIONS:
+            continue
+        with open(os.path.join(source_dir, filename), 'rb') as source:
+            data = source.read()
+        digest = hashlib.sha256(data).hexdigest()[:10]
+        slug = re.sub(r'[^\w-]+', '-', stem)
+
+        with Image.open(io.BytesIO(data)) as original:
+            image = ImageOps.exif_transpose(original)
+            alpha = has_alpha(image)
+            image = image.convert('RGBA' if alpha else 'RGB')
+        fallback = 'png' if alpha else 'jpeg'
+        resized = {}
+
+        entry = {}
+        for variant, width in VARIANTS.items():
+            widths = sorted({min(width * density, image.width) for density in DENSITIES})
+            sources = {}
+            for name in formats + [fallback]:
+                sources[name] = []
+                for pixels in widths:
+                    output = f'{slug}.{digest}.{pixels}w.{EXTENSIONS[name]}'
+                    keep.add(output)
+                    sources[name].append([f'{BUILD_DIR}/{output}', pixels])
+                    path = os.path.join(build_dir, output)
+                    if os.path.exists(path):
+                        continue
+                    if pixels not in resized:
+                        height = max(1, round(image.height * pixels / image.width))
+                        resized[pixels] = image.resize((pixels, height), Image.Resampling.LANCZOS)
+                    # Renamed into place only once complete, so an interrupted build
+                    # never leaves a truncated file that later builds would skip
+                    temporary = path + '.tmp'
+                    with open(temporary, 'wb') as target:
+                        target.write(encode(resized[pixels], name))
+                    os.replace(temporary, path)
+                    written += 1
+            display_width = min(width, image.width)
+            entry[variant] = {
+                'width': display_width,
+                'height': round(image.height * display_width / image.width),
+                'sources': sources,
+                'fallback': fallback,
+            }
+        manifest[f'{SOURCE_DIR}/{filename}'] = entry
+
+    for output in os.listdir(build_dir):
+        if output not in keep:
+            os.remove(os.path.join(build_dir, output))
+    temporary = os.path.join(build_dir, MANIFEST + '.tmp')
+    with open(temporary, 'w') as target:
+        json.dump(manifest, target, indent=1, sort_keys=True)
+    os.replace(temporary, os.path.join(build_dir, MANIFEST))
+    return len(manifest), written
+
+
+class DiskCache:
+    """Size-bounded directory of resized images; the least recently served go first."""
+
+    def __init__(self, directory, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None  # bytes on disk, counted on first write
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        path = os.path.join(self.directory, name)
+        try:
+            os.utime(path)  # mtime doubles as last use; atime is often disabled
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, name, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as target:
+            target.write(data)
+        os.replace(temporary, path)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(entry.stat().st_size for entry in os.scandir(self.directory))
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def _evict(self, keep):
+        # Rescan rather than trust the running total: other workers share the directory.
+        # `keep` was just written and is about to be served, so it is never a candidate.
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.tmp') and entry.path != keep:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+
+resizes = SingleFlight()
+
+
+def negotiate(source_path):
+    # Best format the browser accepts and Pillow can write, else one like the source's
+    # Only explicit listings count: "image/*" also comes from browsers that can't decode AVIF
+    if Image is not None:
+        accepted = {value for value, quality in request.accept_mimetypes if quality > 0}
+        for name in encoders():
+            if MIME_TYPES[name] in accepted:
+                return name
+    return 'png' if source_path.lower().endswith('.png') else 'jpeg'
+
+
+def resize(source_path, width, name):
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        alpha = has_alpha(image) and name != 'jpeg'
+        image = image.convert('RGBA' if alpha else 'RGB')
+    if width < image.width:
+        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS)
+    return encode(image, name)
+
+
+def serve_variant(width, path):
+    source_path = safe_join(current_app.static_folder, path)
+    if width not in ON_DEMAND_WIDTHS or source_path is None or \
+            not path.lower().endswith(SOURCE_EXTENSIONS) or not os.path.isfile(source_path):
+        abort(404)
+    if Image is None:
+        # Without Pillow the original is still better than a broken image
+        return send_file(source_path, max_age=IMAGE_MAX_AGE)
+
+    name = negotiate(source_path)
+    key = f'{path}:{os.stat(source_path).st_mtime_ns}:{width}:{name}'
+    filename = hashlib.sha256(key.encode()).hexdigest()[:32] + '.' + EXTENSIONS[name]
+    disk = current_app.extensions['image_cache']
+
+    def cached_variant():
+        # (path, bytes if this call resized them)
+        cached = disk.get(filename)
+        if cached:
+            return cached, None
+        data = resize(source_path, width, name)
+        return disk.put(filename, data), data
+
+    cached, data = disk.get(filename), None
+    if cached is None:
+        cached, data = resizes.do(filename, cached_variant)
+    try:
+        response = send_file(cached, mimetype=MIME_TYPES[name], max_age=IMAGE_MAX_AGE)
+    except FileNotFoundError:
+        # Another worker evicted it in the meantime
+        if data is None:
+            data = resize(source_path, width, name)
+        response = send_file(io.BytesIO(data), mimetype=MIME_TYPES[name], max_age=IMAGE_MAX_AGE)
+    response.vary.add('Accept')
+    return response
+
+
+@functools.lru_cache(maxsize=4)
+def read_manifest(path, mtime_ns):
+    with open(path) as source:
+        return json.load(source)
+
+
+def manifest():
+    # Re-read only when a build replaces the file
+    path = os.path.join(current_app.static_folder, BUILD_DIR, MANIFEST)
+    try:
+        return read_manifest(path, os.stat(path).st_mtime_ns)
+    except FileNotFoundError:
+        return {}
+
+
+def static_path(image):
+    # Product.image is stored as "static/images/x.png"; the manifest is keyed "images/x.png"
+    image = image.lstrip('/')
+    return image[len('static/'):] if image.startswith('static/') else image
+
+
+def attributes(values):
+    return Markup(' ').join(Markup('{}="{}"').format(name, value) for name, value in values.items())
+
+
+def srcset(files):
+    return ', '.join(f"{url_for('static', filename=path)} {pixels}w" for path, pixels in files)
+
+
+def on_demand_img(path, variant, alt, loading, extra):
+    # Not built ahead of time: resized by /img on first request. The source's mtime in
+    # the URL lets those responses be cached for a year and still change with the file.
+    try:
+        version = os.stat(safe_join(current_app.static_folder, path) or '').st_mtime_ns
+    except OSError:
+        return Markup('<img {}>').format(attributes({'src': url_for('static', filename=path), 'alt': alt,
+                                                      **loading, **extra}))
+    widths = sorted({VARIANTS[variant] * density for density in DENSITIES})
+    urls = [url_for('main.image_variant', width=width, path=path, v=version) for width in widths]
+    return Markup('<img {}>').format(attributes({
+        'src': urls[0], 'srcset': ', '.join(f'{url} {width}w' for url, width in zip(urls, widths)),
+        'sizes': f'{widths[0]}px', 'alt': alt, **loading, **extra,
+    }))
+
+
+def picture(image, variant, alt='', lazy=True, **extra):
+    loading = {'loading': 'lazy' if lazy else 'eager', 'decoding': 'async'}
+    if not image or image.startswith(('http://', 'https://')):
+        return Markup('<img {}>').format(attributes({'src': image or '', 'alt': alt, **loading, **extra}))
+
+    path = static_path(image)
+    entry = manifest().get(path, {}).get(variant)
+    if entry is None:
+        return on_demand_img(path, variant, alt, loading, extra)
+
+    sizes = f"{entry['width']}px"
+    sources = Markup('').join(
+        Markup('<source {}>').format(attributes({
+            'type': MIME_TYPES[name], 'srcset': srcset(files), 'sizes': sizes,
+        }))
+        for name, files in entry['sources'].items() if name != entry['fallback']
+    )
+    fallback = entry['sources'][entry['fallback']]
+    img = Markup('<img {}>').format(attributes({
+        'src': url_for('static', filename=fallback[0][0]), 'srcset': srcset(fallback), 'sizes': sizes,
+        'width': entry['width'], 'height': entry['height'], 'alt': alt, **loading, **extra,
+    }))
+    return Markup('<picture>{}{}</picture>').format(sources, img)
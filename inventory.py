@@ -0,0 +1,132 @@
+# Stock: conditional decrements at checkout, and time-limited holds between opening the
+# checkout page and paying. A hold takes units off Product.stock straight away and records
+# them in stock_reservation; nothing keeps a row locked while the shopper types.
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from models import db, begin_write, Cart, Product, StockReservation
+
+HOLD_MINUTES = 15
+SWEEP_BATCH = 500
+SWEEP_INTERVAL = 60  # seconds
+
+ShortProduct = namedtuple('ShortProduct', 'id name stock')
+
+# Take every cart line's quantity off its product's stock, but only where enough is left.
+# A line that would oversell matches no row, so rowcount < lines means roll back.
+DECREMENT_STOCK_SQL = """
+    UPDATE product SET stock = stock - (
+        SELECT cart.quantity FROM cart WHERE cart.user_id = :user_id AND cart.product_id = product.id)
+    WHERE id IN (SELECT product_id FROM cart WHERE user_id = :user_id)
+      AND stock >= (
+        SELECT cart.quantity FROM cart WHERE cart.user_id = :user_id AND cart.product_id = product.id)
+"""
+
+# expires_at goes through the column's DateTime type, so it is stored in the same format
+# the ORM writes and the sweeper compares against
+HOLD_CART = db.text("""
+    INSERT INTO stock_reservation (user_id, product_id, quantity, expires_at)
+    SELECT user_id, product_id, quantity, :expires_at FROM cart WHERE user_id = :user_id
+""").bindparams(db.bindparam('expires_at', type_=db.DateTime(timezone=True)))
+
+# Put held units back on the shelf; {condition} picks the holds
+RETURN_STOCK_SQL = """
+    UPDATE product SET stock = stock + (
+        SELECT SUM(held.quantity) FROM stock_reservation AS held
+        WHERE held.product_id = product.id AND {condition})
+    WHERE id IN (SELECT held.product_id FROM stock_reservation AS held WHERE {condition})
+"""
+RETURN_USER_STOCK = db.text(RETURN_STOCK_SQL.format(condition='held.user_id = :user_id'))
+RETURN_BATCH_STOCK = db.text(RETURN_STOCK_SQL.format(condition='held.id IN :ids')).bindparams(
+    db.bindparam('ids', expanding=True))
+
+
+class OutOfStock(Exception):
+    def __init__(self, products):
+        super().__init__(', '.join(product.name for product in products))
+        self.products = products
+
+
+def short_products(user_id):
+    # Products the user's cart asks for more of than are on hand. Call it before rolling
+    # back a failed take, while the user's own holds are still counted in the stock;
+    # plain tuples, so the numbers survive the rollback.
+    rows = db.session.execute(
+        db.select(Product.id, Product.name, Product.stock).join(Cart, Cart.product_id == Product.id)
+        .where(Cart.user_id == user_id, Cart.quantity > Product.stock).order_by(Product.id))
+    return [ShortProduct(*row) for row in rows]
+
+
+def release_holds(user_id):
+    # Runs inside the caller's transaction. Locking the holds first (a no-op on SQLite,
+    # where begin_write already serialises writers) stops two concurrent checkouts by
+    # one user on PostgreSQL from both handing the same units back.
+    db.session.execute(db.select(StockReservation.id).filter_by(user_id=user_id).with_for_update())
+    db.session.execute(RETURN_USER_STOCK, {'user_id': user_id})
+    StockReservation.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+
+
+def take_cart_stock(user_id, lines):
+    return db.session.execute(db.text(DECREMENT_STOCK_SQL), {'user_id': user_id}).rowcount == lines
+
+
+def confirm_holds(user_id, lines):
+    # Turn the user's holds into a sale. Handing them back and taking the cart's
+    # quantities in the same write transaction means held units can't go to anyone
+    # else, and a cart edited since reserving is still checked against stock.
+    release_holds(user_id)
+    return take_cart_stock(user_id, lines)
+
+
+def reserve_cart(user_id, minutes=HOLD_MINUTES):
+    # Hold every cart line for `minutes`, replacing the user's earlier holds.
+    # Raises OutOfStock, with nothing held, if any line can't be filled.
+    begin_write()
+    release_holds(user_id)
+    lines = Cart.query.filter_by(user_id=user_id).count()
+    if lines and not take_cart_stock(user_id, lines):
+        short = short_products(user_id)
+        db.session.rollback()
+        raise OutOfStock(short)
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+    db.session.execute(HOLD_CART, {'user_id': user_id, 'expires_at': expires_at})
+    db.session.commit()
+
+
+def release_expired(batch_size=SWEEP_BATCH):
+    # Oldest holds first, walking the expires_at index; one short transaction per batch
+    # so checkouts get the write lock in between
+    released = 0
+    now = datetime.now(timezone.utc)
+    while True:
+        begin_write()
+        ids = db.session.execute(
+            db.select(StockReservation.id).where(StockReservation.expires_at <= now)
+            .order_by(StockReservation.expires_at).limit(batch_size)
+            .with_for_update(skip_locked=True)  # other workers' sweepers take other rows
+        ).scalars().all()
+        if not ids:
+            db.session.rollback()
+            return released
+        db.session.execute(RETURN_BATCH_STOCK, {'ids': ids})
+        StockReservation.query.filter(StockReservation.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        released += len(ids)
+        if len(ids) < batch_size:
+            return released
+
+
+def start_sweeper(app, interval=SWEEP_INTERVAL):
+    # One daemon thread per worker; batches are idempotent, so workers can overlap
+    def sweep():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    release_expired()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception('Releasing expired stock holds failed')
+
+    threading.Thread(target=sweep, name='stock-sweeper', daemon=True).start()
@@ -0,0 +1,116 @@
+from datetime import datetime, timezone
+from flask_sqlalchemy import SQLAlchemy
+from catalog import DEFAULT_STOCK, format_price, parse_price
+
+db = SQLAlchemy()
+
+
+def begin_write():
+    # Take SQLite's single write lock up front. A deferred transaction that reads and
+    # then writes has to upgrade its lock, which fails immediately under contention;
+    # BEGIN IMMEDIATE waits its turn (up to busy_timeout) instead.
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(db.text('BEGIN IMMEDIATE'))
+
+
+# Database Models
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(150), unique=True, nullable=False)
+    email = db.Column(db.String(150), unique=True, nullable=False)
+    password = db.Column(db.String(256), nullable=False)
+    role = db.Column(db.String(50), nullable=False, default="user")  # Default role
+
+class Cart(db.Model):
+    # One row per user and product; also serves every filter_by(user_id=...) cart query
+    __table_args__ = (db.Index('ix_cart_user_product', 'user_id', 'product_id', unique=True),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    quantity = db.Column(db.Integer, default=1)
+
+    user = db.relationship('User', backref='cart_items')
+    product = db.relationship('Product', backref='cart_items')
+
+class Product(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50), nullable=False, default="beauty", index=True)
+    name = db.Column(db.String(150), nullable=False)
+    price_minor = db.Column(db.Integer, nullable=False, index=True)  # cents / paise
+    currency = db.Column(db.String(3), nullable=False, default="USD")
+    unit = db.Column(db.String(50), nullable=True)  # pack size, e.g. "500g" or "per kg"
+    image = db.Column(db.String(150), nullable=True)
+    description = db.Column(db.Text, nullable=True)
+    expiry = db.Column(db.String(20), nullable=True)
+    stock = db.Column(db.Integer, nullable=False, default=DEFAULT_STOCK)  # units on hand
+
+    @property
+    def price(self):
+        return format_price(self.price_minor, self.currency, self.unit)
+
+    @price.setter
+    def price(self, text):
+        # Parse display prices once, when they enter the database
+        self.price_minor, self.currency, self.unit = parse_price(text)
+
+    def __repr__(self):
+        return f"Product('{self.name}', '{self.price}')"
+
+class Order(db.Model):
+    __tablename__ = 'orders'  # "order" is a reserved word in SQL
+    # A retried checkout carries the same key and gets the same order back
+    __table_args__ = (db.Index('ix_orders_user_key', 'user_id', 'idempotency_key', unique=True),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    idempotency_key = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="placed")
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    full_name = db.Column(db.String(150), nullable=False)
+    email = db.Column(db.String(150), nullable=False)
+    phone = db.Column(db.String(50), nullable=False)
+    address = db.Column(db.String(300), nullable=False)
+    city = db.Column(db.String(100), nullable=False)
+    state = db.Column(db.String(100), nullable=False)
+    zip = db.Column(db.String(20), nullable=False)
+    country = db.Column(db.String(100), nullable=False)
+
+    items = db.relationship('OrderItem', backref='order', order_by='OrderItem.id')
+
+class OrderItem(db.Model):
+    # Name and price are copied from the product so later edits don't rewrite history
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    name = db.Column(db.String(150), nullable=False)
+    price_minor = db.Column(db.Integer, nullable=False)
+    currency = db.Column(db.String(3), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+
+class StockReservation(db.Model):
+    # Units held for a shopper until expires_at; already taken off Product.stock
+    __table_args__ = (db.Index('ix_stock_reservation_user_product', 'user_id', 'product_id', unique=True),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True)  # the sweeper walks this
+
+class RateLimitBucket(db.Model):
+    # Login throttling state shared between worker processes; times are Unix seconds
+    key = db.Column(db.String(200), primary_key=True)  # "ip:..." or "account:..."
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)
+    full_at = db.Column(db.Float, nullable=False, index=True)  # refilled by then; safe to delete
+
+class CatalogVersion(db.Model):
+    # Single row, bumped by every admin product edit; keys the rendered-catalog caches
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+class SchemaVersion(db.Model):
+    # Single row recording which migrations have been applied
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
@@ -0,0 +1,60 @@
+# Checkout: turn a user's cart into an Order in one short write transaction.
+from sqlalchemy.exc import IntegrityError
+from inventory import OutOfStock, confirm_holds, short_products
+from models import db, begin_write, Cart, Order
+
+SHIPPING_FIELDS = ('full_name', 'email', 'phone', 'address', 'city', 'state', 'zip', 'country')
+
+# Copy every cart line into the order set-wise, with the product's current name and price
+COPY_CART_SQL = """
+    INSERT INTO order_item (order_id, product_id, name, price_minor, currency, quantity)
+    SELECT :order_id, product.id, product.name, product.price_minor, product.currency, cart.quantity
+    FROM cart JOIN product ON product.id = cart.product_id
+    WHERE cart.user_id = :user_id
+"""
+
+
+def find_order(user_id, idempotency_key):
+    return Order.query.filter_by(user_id=user_id, idempotency_key=idempotency_key).first()
+
+
+def place_order(user_id, idempotency_key, shipping):
+    # Returns the order (the existing one on a retried key), or None for an empty cart;
+    # raises OutOfStock, with nothing written, if any line can't be filled
+    try:
+        begin_write()
+        order = find_order(user_id, idempotency_key)
+        if order is not None:
+            db.session.rollback()
+            return order
+
+        lines = Cart.query.filter_by(user_id=user_id).count()
+        if not lines:
+            db.session.rollback()
+            return None
+
+        if not confirm_holds(user_id, lines):
+            short = short_products(user_id)
+            db.session.rollback()
+            raise OutOfStock(short)
+
+        order = Order(user_id=user_id, idempotency_key=idempotency_key,
+                      **{field: shipping[field] for field in SHIPPING_FIELDS})
+        db.session.add(order)
+        db.session.flush()
+        db.session.execute(db.text(COPY_CART_SQL), {'order_id': order.id, 'user_id': user_id})
+        Cart.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        db.session.commit()
+        return order
+    except IntegrityError:
+        # A concurrent retry with the same key won the race on databases without
+        # SQLite's single writer; hand back the order it created
+        db.session.rollback()
+        return find_order(user_id, idempotency_key)
+
+
+def order_totals(order):
+    totals = {}
+    for item in order.items:
+        totals[item.currency] = totals.get(item.currency, 0) + item.price_minor * item.quantity
+    return sorted(totals.items())
@@ -0,0 +1,60 @@
+# Password hashing on a small, bounded pool of threads. PBKDF2 is slow on purpose and
+# releases the GIL while it runs, so a fixed number of hashing threads caps how many
+# cores a burst of logins can take from everything else. Past `max_pending` queued
+# hashes, new ones fail fast with HasherBusy instead of tying up more request threads.
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+HASH_METHOD = 'pbkdf2:sha256'  # any werkzeug method, e.g. 'pbkdf2:sha256:600000' or 'scrypt'
+HASH_WORKERS = 2
+MAX_PENDING = 16
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, method=HASH_METHOD, workers=HASH_WORKERS, max_pending=MAX_PENDING):
+        self.method = method
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    @cached_property
+    def prefix(self):
+        # e.g. "pbkdf2:sha256:1000000"; werkzeug fills in default parameters, so ask it once
+        return generate_password_hash('', method=self.method).split('$', 1)[0]
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self._executor.submit(function, *args).result()
+        finally:
+            self._slots.release()
+
+    def _check(self, stored, password):
+        if not check_password_hash(stored, password):
+            return False, None
+        if stored.split('$', 1)[0] == self.prefix:
+            return True, None
+        # Hashed with older parameters: the plaintext is at hand, so upgrade it now
+        return True, generate_password_hash(password, method=self.method)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored, password):
+        # (matches, new hash to store or None)
+        return self._run(self._check, stored, password)
+
+
+def hash_password(password):
+    return current_app.extensions['password_hasher'].hash(password)
+
+
+def verify_password(stored, password):
+    return current_app.extensions['password_hasher'].verify(stored, password)
@@ -0,0 +1,115 @@
+# Login throttling with token buckets, one per client IP and one per account. Each
+# attempt takes a token; tokens drip back at a fixed rate up to the bucket's capacity,
+# so bursts are allowed but sustained guessing is held to the refill rate. Checked
+# before the user lookup and password hash, so rejected attempts cost almost nothing.
+#
+# Buckets live in a bounded in-process LRU by default. With several worker processes
+# set LOGIN_RATE_LIMIT_BACKEND = 'database' to share them through rate_limit_bucket.
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import current_app
+from database import upsert_insert
+from models import db, begin_write, RateLimitBucket
+
+# `capacity` attempts in a burst, then one more every `per_seconds`
+Limit = namedtuple('Limit', 'capacity per_seconds')
+
+IP_LIMIT = Limit(20, 6)
+ACCOUNT_LIMIT = Limit(5, 60)
+MAX_KEYS = 10000
+PRUNE_EVERY = 1000  # database backend: delete refilled rows every this many attempts
+
+
+def refill(tokens, updated_at, now, limit):
+    return min(limit.capacity, tokens + (now - updated_at) / limit.per_seconds)
+
+
+def full_at(tokens, now, limit):
+    # A bucket that has refilled is the same as no bucket, so it can be forgotten then
+    return now + (limit.capacity - tokens) * limit.per_seconds
+
+
+def take_token(tokens, limit):
+    # (tokens left, seconds to wait; 0 if the attempt may go ahead)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) * limit.per_seconds
+
+
+class MemoryBuckets:
+    def __init__(self, max_keys=MAX_KEYS):
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at, full_at), least recent first
+        self._max_keys = max_keys
+        self._lock = threading.Lock()
+
+    def take(self, key, limit, now):
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.pop(key, (limit.capacity, now, now))
+            tokens, wait = take_token(refill(tokens, updated_at, now, limit), limit)
+            self._buckets[key] = (tokens, now, full_at(tokens, now, limit))
+            while self._buckets and next(iter(self._buckets.values()))[2] <= now:
+                self._buckets.popitem(last=False)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class DatabaseBuckets:
+    def __init__(self):
+        self._attempts = 0
+
+    def take(self, key, limit, now):
+        begin_write()
+        row = db.session.execute(
+            db.select(RateLimitBucket.tokens, RateLimitBucket.updated_at)
+            .where(RateLimitBucket.key == key).with_for_update()
+        ).first()
+        tokens = refill(row.tokens, row.updated_at, now, limit) if row else limit.capacity
+        tokens, wait = take_token(tokens, limit)
+        values = {'tokens': tokens, 'updated_at': now, 'full_at': full_at(tokens, now, limit)}
+        statement = upsert_insert(db.engine)(RateLimitBucket).values(key=key, **values)
+        db.session.execute(statement.on_conflict_do_update(index_elements=[RateLimitBucket.key], set_=values))
+        self._attempts += 1
+        if self._attempts % PRUNE_EVERY == 0:
+            RateLimitBucket.query.filter(RateLimitBucket.full_at <= now).delete(synchronize_session=False)
+        db.session.commit()
+        return wait
+
+    def reset(self, key):
+        RateLimitBucket.query.filter_by(key=key).delete(synchronize_session=False)
+        db.session.commit()
+
+
+BACKENDS = {'memory': MemoryBuckets, 'database': DatabaseBuckets}
+
+
+class LoginLimiter:
+    def __init__(self, buckets, ip_limit=IP_LIMIT, account_limit=ACCOUNT_LIMIT):
+        self.buckets = buckets
+        self.ip_limit = Limit(*ip_limit)
+        self.account_limit = Limit(*account_limit)
+
+    def check(self, ip, account):
+        # Seconds until the next attempt is allowed; 0 means go ahead
+        now = time.time()
+        wait = self.buckets.take(f'ip:{ip}', self.ip_limit, now)
+        if not wait:
+            wait = self.buckets.take(f'account:{account.strip().lower()}', self.account_limit, now)
+        return wait
+
+    def succeeded(self, account):
+        # The owner got in; don't leave their account locked by earlier typos
+        self.buckets.reset(f'account:{account.strip().lower()}')
+
+
+def check_login(ip, account):
+    return current_app.extensions['login_limiter'].check(ip, account)
+
+
+def login_succeeded(account):
+    current_app.extensions['login_limiter'].succeeded(account)
@@ -0,0 +1,92 @@
+# Schema migrations and seed data loading, run from the `flask init-db` command.
+# Nothing here runs at import time, so worker startup never touches the database.
+from sqlalchemy import inspect
+from werkzeug.security import generate_password_hash
+from catalog import DEFAULT_STOCK, SEED_PRODUCTS
+from models import db, User, Product, CatalogVersion, SchemaVersion
+from search import create_search_index
+
+SCHEMA_VERSION = 8
+
+# version -> statements that upgrade a database from version - 1
+MIGRATIONS = {
+    3: [
+        # Fold duplicate cart rows into one before enforcing (user_id, product_id)
+        """UPDATE cart SET quantity = (
+               SELECT SUM(COALESCE(other.quantity, 1)) FROM cart AS other
+               WHERE other.user_id = cart.user_id AND other.product_id = cart.product_id)
+           WHERE id IN (SELECT MIN(id) FROM cart GROUP BY user_id, product_id HAVING COUNT(*) > 1)""",
+        "DELETE FROM cart WHERE id NOT IN (SELECT MIN(id) FROM cart GROUP BY user_id, product_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_cart_user_product ON cart (user_id, product_id)",
+    ],
+    5: [
+        f"ALTER TABLE product ADD COLUMN stock INTEGER NOT NULL DEFAULT {DEFAULT_STOCK}",
+    ],
+}
+
+
+def current_version():
+    if not inspect(db.engine).has_table('schema_version'):
+        return 0
+    row = db.session.get(SchemaVersion, 1)
+    return row.version if row else 0
+
+
+def migrate():
+    version = current_version()
+    if version == SCHEMA_VERSION:
+        return False
+
+    if version == 0:
+        # Unversioned databases were rebuilt on every boot, so start them fresh
+        db.drop_all()
+        db.create_all()
+    else:
+        # One connection for the whole upgrade: a second one would wait on this one's write lock
+        db.session.commit()
+        with db.engine.begin() as connection:
+            for step in range(version + 1, SCHEMA_VERSION + 1):
+                for statement in MIGRATIONS.get(step, ()):
+                    connection.execute(db.text(statement))
+            db.metadata.create_all(connection)  # Tables added since `version`
+    create_search_index()  # FTS table and triggers are not part of the models
+
+    db.session.merge(SchemaVersion(id=1, version=SCHEMA_VERSION))
+    db.session.commit()
+    return True
+
+
+def seed():
+    # Bulk-load the admin user and catalog in one transaction, only if missing
+    added = 0
+    if not db.session.query(User.query.filter_by(email='admin@example.com').exists()).scalar():
+        hashed_password = generate_password_hash('adminpassword', method='pbkdf2:sha256')
+        db.session.add(User(username='admin', email='admin@example.com', password=hashed_password, role='admin'))
+        added += 1
+
+    if not db.session.query(Product.query.exists()).scalar():
+        for category, products in SEED_PRODUCTS.items():
+            db.session.add_all(
+                Product(category=category, name=product['name'], price=product['price'],
+                        image=product['image'], expiry=product.get('expiry'),
+                        description=product.get('description', ''))
+                for product in products
+            )
+            added += len(products)
+
+    catalog_version = db.session.get(CatalogVersion, 1)
+    if catalog_version is None:
+        db.session.add(CatalogVersion(id=1, version=1))
+        added += 1
+    elif added:
+        catalog_version.version += 1
+
+    if added:
+        db.session.commit()
+    return added
+
+
+def init_db():
+    migrated = migrate()
+    added = seed()
+    return migrated, added
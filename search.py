@@ -0,0 +1,262 @@
+# Product search backed by an SQLite FTS5 index over Product.name and Product.description,
+# plus in-memory prefix and spelling indexes over names for typeahead and "did you mean".
+# Other databases fall back to substring matching until they get an index of their own.
+import re
+import threading
+from bisect import bisect_left, insort
+from flask import current_app
+from cache import catalog_version
+from models import db, Product
+from spelling import SpellIndex
+from synonyms import SYNONYMS
+
+PER_PAGE = 20
+SUGGEST_LIMIT = 8
+MAX_QUERY_LENGTH = 200
+MAX_QUERY_TOKENS = 8
+
+# Name matches count ten times as much as description matches in the BM25 score
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# External-content FTS table: it stores only the index, rows stay in `product`.
+# Triggers keep it in sync with every insert, update and delete.
+FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(
+        name, description,
+        content='product', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS product_fts_insert AFTER INSERT ON product BEGIN
+        INSERT INTO product_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS product_fts_delete AFTER DELETE ON product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS product_fts_update AFTER UPDATE OF name, description ON product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO product_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+SEARCH_SQL = f"""
+    SELECT product.* FROM product_fts
+    JOIN product ON product.id = product_fts.rowid
+    WHERE product_fts MATCH :match
+    ORDER BY bm25(product_fts, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}), product.id
+    LIMIT :limit OFFSET :offset
+"""
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def create_search_index():
+    # Idempotent; rebuild picks up rows that existed before the index did
+    if db.engine.dialect.name != 'sqlite':
+        return
+    for statement in FTS_SCHEMA:
+        db.session.execute(db.text(statement))
+    db.session.execute(db.text("INSERT INTO product_fts(product_fts) VALUES ('rebuild')"))
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def query_tokens(query):
+    # Search input is untrusted, so only its start is matched or spell-checked
+    return tokenize(query[:MAX_QUERY_LENGTH])[:MAX_QUERY_TOKENS]
+
+
+def compile_synonyms(synonyms):
+    # word -> ready-made FTS group, e.g. "aloo" -> ("aloo"* OR "potato"*)
+    expansions = {}
+    for word, alternatives in synonyms.items():
+        terms = [word] + [' '.join(tokenize(alternative)) for alternative in alternatives]
+        expansions[word] = '(' + ' OR '.join(f'"{term}"*' for term in dict.fromkeys(terms)) + ')'
+    return expansions
+
+
+EXPANSIONS = compile_synonyms(SYNONYMS)
+
+
+def match_expression(tokens):
+    # Every token must match, each as a prefix: "lay mag" -> "lay"* AND "mag"*,
+    # and known Hinglish words also match their catalog names
+    return ' AND '.join(EXPANSIONS.get(token) or f'"{token}"*' for token in tokens)
+
+
+def substring_filter(tokens):
+    # Every token, or one of its synonyms, must appear in the name or description
+    conditions = []
+    for token in tokens:
+        terms = [token] + [' '.join(tokenize(alternative)) for alternative in SYNONYMS.get(token, ())]
+        conditions.append(db.or_(*(
+            column.icontains(term, autoescape=True)
+            for term in terms for column in (Product.name, Product.description)
+        )))
+    return db.and_(*conditions)
+
+
+def search_products(query, page=1, per_page=PER_PAGE):
+    # Returns one page of products and whether a further page exists
+    offset = (max(page, 1) - 1) * per_page
+    if not query.strip():
+        results = Product.query.order_by(Product.id).offset(offset).limit(per_page + 1).all()
+        return results[:per_page], len(results) > per_page
+
+    tokens = query_tokens(query)
+    if not tokens:
+        return [], False
+    if db.engine.dialect.name != 'sqlite':
+        results = (Product.query.filter(substring_filter(tokens)).order_by(Product.id)
+                   .offset(offset).limit(per_page + 1).all())
+        return results[:per_page], len(results) > per_page
+
+    statement = db.select(Product).from_statement(db.text(SEARCH_SQL))
+    results = db.session.execute(statement, {
+        'match': match_expression(tokens), 'limit': per_page + 1, 'offset': offset,
+    }).scalars().all()
+    return results[:per_page], len(results) > per_page
+
+
+class PrefixIndex:
+    """Sorted (key, product_id) pairs answering typeahead lookups with bisect.
+
+    Every word of a name starts a key, so "mag" finds "Lay's India's Magic Masala".
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._names = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    @staticmethod
+    def _keys(name):
+        name = name.lower()
+        return {name[match.start():] for match in TOKEN_PATTERN.finditer(name)}
+
+    def load(self, rows):
+        entries = sorted((key, product_id) for product_id, name in rows for key in self._keys(name))
+        with self._lock:
+            self._entries = entries
+            self._names = dict(rows)
+            self.loaded = True
+
+    def add(self, product_id, name):
+        with self._lock:
+            self._discard(product_id)
+            self._names[product_id] = name
+            for key in self._keys(name):
+                insort(self._entries, (key, product_id))
+
+    def remove(self, product_id):
+        with self._lock:
+            self._discard(product_id)
+
+    def _discard(self, product_id):
+        name = self._names.pop(product_id, None)
+        if name is None:
+            return
+        for key in self._keys(name):
+            position = bisect_left(self._entries, (key, product_id))
+            if position < len(self._entries) and self._entries[position] == (key, product_id):
+                del self._entries[position]
+
+    def name_of(self, product_id):
+        return self._names.get(product_id)
+
+    def lookup(self, prefix, limit=SUGGEST_LIMIT):
+        prefix = prefix.lower().strip()
+        if not prefix:
+            return []
+        found = {}
+        with self._lock:
+            position = bisect_left(self._entries, (prefix,))
+            while position < len(self._entries) and len(found) < limit:
+                key, product_id = self._entries[position]
+                if not key.startswith(prefix):
+                    break
+                found.setdefault(product_id, self._names[product_id])
+                position += 1
+        return list(found.items())
+
+
+class SearchIndexes:
+    """One app's typeahead and spelling indexes; a rebuild swaps both at once."""
+
+    def __init__(self):
+        self.suggestions = PrefixIndex()
+        self.spelling = SpellIndex()
+        self.lock = threading.Lock()  # held while the indexes are built, swapped or edited
+
+
+def build_indexes():
+    rows = db.session.execute(db.select(Product.id, Product.name)).all()
+    spell_index = SpellIndex()
+    spell_index.add(token for _, name in rows for token in tokenize(name))
+    spell_index.add(EXPANSIONS)  # So "aloo" is never "corrected" and "alooo" is
+    prefix_index = PrefixIndex()
+    prefix_index.load(rows)
+    return prefix_index, spell_index
+
+
+def load_indexes():
+    # Built from the database once per worker, then kept current by admin edits.
+    # Reading the catalog version first means every edit after the build is seen as a
+    # change, so other workers' edits reach refresh_indexes even on typeahead-only traffic.
+    catalog_version().current()
+    indexes = current_app.extensions['search_indexes']
+    if indexes.suggestions.loaded:
+        return indexes
+    with indexes.lock:
+        if not indexes.suggestions.loaded:
+            indexes.suggestions, indexes.spelling = build_indexes()
+    return indexes
+
+
+def refresh_indexes():
+    # The catalog changed in another worker: rebuild on a background thread and swap the
+    # new indexes in, while requests keep using the current ones
+    indexes = current_app.extensions['search_indexes']
+    if not indexes.suggestions.loaded:
+        return  # Nothing built yet; the next lookup loads from the database anyway
+    app = current_app._get_current_object()
+
+    def rebuild():
+        with app.app_context(), indexes.lock:
+            indexes.suggestions, indexes.spelling = build_indexes()
+
+    threading.Thread(target=rebuild, name='search-index-refresh', daemon=True).start()
+
+
+def index_product(product_id, name):
+    indexes = load_indexes()
+    with indexes.lock:
+        old_name = indexes.suggestions.name_of(product_id)
+        if old_name is not None:
+            indexes.spelling.remove(tokenize(old_name))
+        indexes.spelling.add(tokenize(name))
+        indexes.suggestions.add(product_id, name)
+
+
+def unindex_product(product_id):
+    indexes = load_indexes()
+    with indexes.lock:
+        old_name = indexes.suggestions.name_of(product_id)
+        if old_name is not None:
+            indexes.spelling.remove(tokenize(old_name))
+        indexes.suggestions.remove(product_id)
+
+
+def suggest(prefix, limit=SUGGEST_LIMIT):
+    return load_indexes().suggestions.lookup(prefix, limit)
+
+
+def correct_query(query):
+    # "pomegranet raddish" -> "pomegranate raddish"; None when every word is known
+    spelling = load_indexes().spelling
+    tokens = query_tokens(query)
+    corrected = [spelling.correct(token) or token for token in tokens]
+    return ' '.join(corrected) if corrected != tokens else None
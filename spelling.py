@@ -0,0 +1,107 @@
+# Spelling correction with a SymSpell-style deletion index.
+#
+# Every vocabulary word is stored under each string reachable from it by deleting up to
+# MAX_DISTANCE characters. A query word only needs its own deletes looked up, so a
+# correction costs a handful of dict hits instead of an edit-distance scan of the catalog.
+import threading
+from itertools import combinations
+
+MAX_DISTANCE = 2
+MIN_WORD_LENGTH = 3
+
+
+def max_distance_for(word):
+    # Short words get one edit, longer ones two
+    return 1 if len(word) <= 4 else MAX_DISTANCE
+
+
+def deletes(word, distance):
+    found = {word}
+    for count in range(1, min(distance, len(word) - 1) + 1):
+        for positions in combinations(range(len(word)), count):
+            found.add(''.join(char for index, char in enumerate(word) if index not in positions))
+    return found
+
+
+def edit_distance(a, b, limit):
+    # Optimal string alignment distance; gives up once it exceeds `limit`
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SpellIndex:
+    def __init__(self):
+        self._counts = {}
+        self._deletes = {}
+        self._longest = 0
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._counts = {}
+            self._deletes = {}
+            self._longest = 0
+
+    def add(self, words):
+        with self._lock:
+            for word in words:
+                if len(word) < MIN_WORD_LENGTH:
+                    continue
+                self._counts[word] = self._counts.get(word, 0) + 1
+                if self._counts[word] == 1:
+                    self._longest = max(self._longest, len(word))
+                    for variant in deletes(word, max_distance_for(word)):
+                        self._deletes.setdefault(variant, set()).add(word)
+
+    def remove(self, words):
+        with self._lock:
+            for word in words:
+                if word not in self._counts:
+                    continue
+                self._counts[word] -= 1
+                if self._counts[word]:
+                    continue
+                del self._counts[word]
+                for variant in deletes(word, max_distance_for(word)):
+                    bucket = self._deletes.get(variant)
+                    if bucket:
+                        bucket.discard(word)
+                        if not bucket:
+                            del self._deletes[variant]
+
+    def __contains__(self, word):
+        return word in self._counts
+
+    def correct(self, word):
+        # Closest vocabulary word, most frequent on ties; None if nothing is close enough
+        if len(word) < MIN_WORD_LENGTH or word in self._counts:
+            return None
+        # Nothing in the vocabulary is within reach, and deletes() grows as len(word) ** 2
+        if len(word) > self._longest + MAX_DISTANCE:
+            return None
+        limit = max_distance_for(word)
+        best = None
+        with self._lock:
+            candidates = set()
+            for variant in deletes(word, limit):
+                candidates.update(self._deletes.get(variant, ()))
+            for candidate in candidates:
+                distance = edit_distance(word, candidate, limit)
+                if distance > limit:
+                    continue
+                rank = (distance, -self._counts[candidate], candidate)
+                if best is None or rank < best:
+                    best = rank
+        return best[2] if best else None
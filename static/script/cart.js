@@ -0,0 +1,63 @@
+// Header mini-cart count, filled from the cart summary API on every page load; the
+// request revalidates against the last ETag, so an unchanged cart costs a bodiless 304.
+// Background "Add to Cart": forms marked data-cart-add post to the JSON cart API
+// instead of reloading the page. If the API refuses (e.g. not logged in), the form
+// is submitted normally so the shopper gets the usual redirect and message.
+(function() {
+    var badge = document.getElementById("cart-count");
+
+    function showCount(summary) {
+        if (!badge) {
+            return;
+        }
+        badge.textContent = summary.count;
+        badge.style.display = summary.count ? "inline-block" : "none";
+    }
+
+    if (badge && badge.dataset.summaryUrl) {
+        fetch(badge.dataset.summaryUrl, {cache: "no-cache", headers: {"Accept": "application/json"}})
+            .then(function(response) {
+                return response.ok ? response.json() : null;
+            })
+            .then(function(summary) {
+                if (summary) {
+                    showCount(summary);
+                }
+            })
+            .catch(function() {});
+    }
+
+    document.addEventListener("submit", function(event) {
+        var form = event.target;
+        if (!form.matches("form[data-cart-add]")) {
+            return;
+        }
+        event.preventDefault();
+        var button = form.querySelector("button");
+        if (button) {
+            button.disabled = true;
+        }
+        fetch(form.dataset.cartAdd, {
+            method: "POST",
+            headers: {"Content-Type": "application/json"},
+            body: JSON.stringify({product_id: Number(form.dataset.productId), quantity: 1})
+        })
+            .then(function(response) {
+                if (!response.ok) {
+                    throw new Error(response.status);
+                }
+                return response.json();
+            })
+            .then(function(summary) {
+                showCount(summary);
+                if (button) {
+                    button.disabled = false;
+                    button.textContent = "Added ✓";
+                    setTimeout(function() { button.textContent = "Add to Cart"; }, 1500);
+                }
+            })
+            .catch(function() {
+                form.submit();
+            });
+    });
+})();
@@ -0,0 +1,36 @@
+// Infinite scroll: when the "Load more" marker comes into view, fetch the next page of
+// cards as an HTML fragment and append it to the page's .scroll-container.
+(function() {
+    var marker = document.querySelector(".load-more[data-next-url]");
+    var container = document.querySelector(".scroll-container");
+    if (!marker || !container || !("IntersectionObserver" in window)) {
+        return;
+    }
+    var loading = false;
+
+    var observer = new IntersectionObserver(function(entries) {
+        if (!entries[0].isIntersecting || loading) {
+            return;
+        }
+        loading = true;
+        fetch(marker.dataset.nextUrl, {headers: {"X-Requested-With": "fetch"}})
+            .then(function(response) {
+                return response.text().then(function(html) {
+                    container.insertAdjacentHTML("beforeend", html);
+                    var next = response.headers.get("X-Next-Page");
+                    if (next) {
+                        marker.dataset.nextUrl = next;
+                        loading = false;
+                    } else {
+                        observer.disconnect();
+                        marker.remove();
+                    }
+                });
+            })
+            .catch(function() {
+                loading = false;
+            });
+    }, {rootMargin: "600px"});
+
+    observer.observe(marker);
+})();
@@ -0,0 +1,82 @@
+# Hinglish / transliterated and everyday words shoppers type, mapped to the words our
+# catalog names use. search.py compiles this into FTS expressions once at import.
+
+SYNONYMS = {
+    # Fruits
+    'seb': ['apple'],
+    'kela': ['banana'],
+    'aam': ['mango'],
+    'santra': ['orange'],
+    'narangi': ['orange'],
+    'lychee': ['litchi'],
+    'angoor': ['grapes'],
+    'anaar': ['pomegranate'],
+    'anar': ['pomegranate'],
+    'tarbooz': ['watermelon'],
+    'tarbuj': ['watermelon'],
+    'kharbooja': ['muskmelon'],
+    'kharbuja': ['muskmelon'],
+    'papita': ['papaya'],
+    'amrood': ['guava'],
+    'amrud': ['guava'],
+    'ananas': ['pineapple'],
+
+    # Vegetables
+    'aloo': ['potato'],
+    'alu': ['potato'],
+    'pyaaz': ['onion'],
+    'pyaz': ['onion'],
+    'kanda': ['onion'],
+    'tamatar': ['tomato'],
+    'gajar': ['carrot'],
+    'mirch': ['chilli', 'capsicum'],
+    'mirchi': ['chilli'],
+    'chili': ['chilli'],
+    'gobhi': ['cauliflower'],
+    'gobi': ['cauliflower'],
+    'adrak': ['ginger'],
+    'lehsun': ['garlic'],
+    'lahsun': ['garlic'],
+    'kheera': ['cucumber'],
+    'khira': ['cucumber'],
+    'mooli': ['raddish'],
+    'radish': ['raddish'],
+    'nimbu': ['lemon'],
+    'nimboo': ['lemon'],
+    'khumb': ['mushroom'],
+    'phali': ['beans'],
+
+    # Dairy, breakfast and pantry
+    'doodh': ['milk'],
+    'dudh': ['milk'],
+    'dahi': ['curd'],
+    'yogurt': ['curd'],
+    'makhan': ['butter'],
+    'malai': ['cream'],
+    'anda': ['eggs'],
+    'ande': ['eggs'],
+    'egg': ['eggs'],
+    'double': ['bread'],
+    'chai': ['tea'],
+    'shahad': ['honey'],
+    'sirka': ['vinegar'],
+    'chawal': ['rice'],
+    'aata': ['atta'],
+    'daal': ['dal'],
+    'chole': ['chana'],
+    'chhole': ['chana'],
+
+    # Snacks and drinks
+    'chips': ['lay'],
+    'namkeen': ['bhujia', 'kurkure'],
+    'biscuit': ['oreo', 'good day', 'jim jam', 'hide seek', 'dark fantasy'],
+    'biscuits': ['oreo', 'good day', 'jim jam', 'hide seek', 'dark fantasy'],
+    'noodles': ['maggi'],
+    'pasta': ['macroni', 'penne'],
+    'chocolate': ['choco', 'kit kat', 'munch', 'ferrero', 'dairy milk'],
+    'soda': ['sprite', 'fanta', 'limca', 'thumsup'],
+    'cola': ['thumsup', 'coke'],
+    'coldrink': ['sprite', 'fanta', 'limca', 'thumsup', 'maza', 'dew'],
+    'juice': ['maza'],
+    'gum': ['chewing'],
+}